@@ -0,0 +1,139 @@
+"""Benchmark every API router against a synthetic city and keep a JSON baseline.
+
+Generate data with benchmarks.synthetic_city, start the API (for example
+'uvicorn main:app --workers 1') and run from the backend directory:
+
+    python -m benchmarks.api_benchmark --output baseline.json
+    python -m benchmarks.api_benchmark --baseline baseline.json --output current.json
+
+With --baseline, each scenario is compared to the stored run and the command
+exits non-zero if p95 latency rose or throughput fell by more than
+--tolerance. The live event stream is not benchmarked, since it holds
+connections open by design.
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from benchmarks.load_test import run_load
+from benchmarks.synthetic_city import CITY_CENTRE
+
+def _tile(lon, lat, z):
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return f"{z}/{x}/{y}"
+
+def scenarios(email, password):
+    """(router, name, path, form body) for each benchmarked request"""
+    lon, lat = CITY_CENTRE
+    bbox = f"{lon - 0.02},{lat - 0.02},{lon + 0.02},{lat + 0.02}"
+    return [
+        ("auth", "login", "/api/auth/login", {"username": email, "password": password}),
+        ("complaints", "list", "/api/complaints/list?limit=100", None),
+        ("complaints", "list-columnar", "/api/complaints/list?limit=1000&format=columnar", None),
+        ("complaints", "list-bbox", f"/api/complaints/list?bbox={bbox}&limit=500", None),
+        ("complaints", "nearest", f"/api/complaints/list?lat={lat}&lon={lon}&nearest=50", None),
+        ("buildings", "list-bbox", f"/api/buildings/list?bbox={bbox}", None),
+        ("utilities", "consumption-list", "/api/utilities/consumption/list?building_id=1", None),
+        ("utilities", "consumption-monthly", "/api/utilities/consumption/list?granularity=month", None),
+        ("utilities", "analytics", "/api/utilities/consumption/analytics/1", None),
+        ("utilities", "predict", "/api/utilities/consumption/predict/1/water?model=holt_winters", None),
+        ("dashboard", "stats", "/api/dashboard/stats", None),
+        ("dashboard", "trends", "/api/dashboard/complaint-trends", None),
+        ("dashboard", "categories", "/api/dashboard/category-distribution", None),
+        ("dashboard", "hotspots", "/api/dashboard/hotspots?days=90", None),
+        ("tiles", "complaints-z12", f"/api/tiles/complaints/{_tile(lon, lat, 12)}.mvt", None),
+        ("tiles", "complaints-z16", f"/api/tiles/complaints/{_tile(lon, lat, 16)}.mvt", None),
+        ("tiles", "buildings-z14", f"/api/tiles/buildings/{_tile(lon, lat, 14)}.mvt", None),
+    ]
+
+def login(base_url, email, password):
+    body = urllib.parse.urlencode({"username": email, "password": password}).encode()
+    with urllib.request.urlopen(base_url.rstrip("/") + "/api/auth/login", data=body, timeout=30) as response:
+        return json.load(response)["access_token"]
+
+def _revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def compare(results, baseline, tolerance):
+    """Print the change against a baseline run and return the regressed scenarios"""
+    previous = {(r["name"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'scenario':<32}{'conc':>6}{'p95 ms':>18}{'req/s':>18}")
+    for result in results:
+        before = previous.get((result["name"], result["concurrency"]))
+        if not before or not before["p95_ms"] or not result["p95_ms"]:
+            continue
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1
+        rps_change = result["throughput_rps"] / before["throughput_rps"] - 1
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        if regressed:
+            regressions.append(result["name"])
+        print(
+            f"{result['name']:<32}{result['concurrency']:>6}"
+            f"{before['p95_ms']:>8.1f} -> {result['p95_ms']:<7.1f}"
+            f"{before['throughput_rps']:>8.1f} -> {result['throughput_rps']:<7.1f}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@city.test")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--concurrency", type=int, action="append", dest="levels")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--router", action="append", dest="routers", help="Only benchmark these routers")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    token = login(args.url, args.email, args.password)
+    results = []
+    print(f"{'scenario':<32}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for router, name, path, data in scenarios(args.email, args.password):
+        if args.routers and router not in args.routers:
+            continue
+        for concurrency in args.levels or [1, 16]:
+            result = run_load(args.url, path, concurrency, args.duration, token, data=data)
+            result.update(router=router, name=f"{router}/{name}")
+            results.append(result)
+            print(
+                f"{result['name']:<32}{concurrency:>6}{result['throughput_rps']:>10.1f}"
+                f"{result['p50_ms'] or 0:>10.1f}{result['p95_ms'] or 0:>10.1f}{result['errors']:>8}"
+            )
+
+    run = {
+        "meta": {
+            "revision": _revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "url": args.url,
+            "duration": args.duration
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
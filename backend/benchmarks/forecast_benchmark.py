@@ -0,0 +1,86 @@
+"""Compare latency and accuracy of the forecasting engines on synthetic series.
+
+Run from the backend directory:
+
+    python -m benchmarks.forecast_benchmark --series 1000 --prophet-series 20
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from ml.forecaster import FAST_MODELS, forecast_many
+
+def synthetic_series(count, length, seed=0):
+    """Daily consumption with trend, weekly and yearly seasonality, noise and gaps"""
+    rng = np.random.default_rng(seed)
+    histories = []
+    for _ in range(count):
+        t = np.arange(length)
+        base = rng.uniform(500, 20000)
+        y = (
+            base
+            + base * rng.uniform(-0.0005, 0.001) * t
+            + base * rng.uniform(0.02, 0.15) * np.sin(2 * np.pi * t / 7 + rng.uniform(0, 2 * np.pi))
+            + base * rng.uniform(0.0, 0.2) * np.sin(2 * np.pi * t / 365.25)
+            + rng.normal(0, base * 0.03, length)
+        )
+        dates = pd.date_range("2021-01-01", periods=length, freq="D")
+        keep = rng.random(length) > 0.02
+        keep[-1] = True
+        histories.append(pd.DataFrame({"ds": dates[keep], "y": y[keep]}))
+    return histories
+
+def split(histories, horizon):
+    train = [h.iloc[:-horizon] for h in histories]
+    actual = [h["y"].to_numpy()[-horizon:] for h in histories]
+    return train, actual
+
+def score(predictions, actual, horizon):
+    """Mean absolute percentage error and 80% interval coverage over the holdout"""
+    yhat = np.array([[p["predicted_value"] for p in series[:horizon]] for series in predictions])
+    lower = np.array([[p["lower_bound"] for p in series[:horizon]] for series in predictions])
+    upper = np.array([[p["upper_bound"] for p in series[:horizon]] for series in predictions])
+    actual = np.array(actual)
+    mape = float(np.mean(np.abs(yhat - actual) / np.abs(actual)) * 100)
+    coverage = float(np.mean((actual >= lower) & (actual <= upper)) * 100)
+    return mape, coverage
+
+def run_prophet(train, horizon):
+    from services.forecasting import prophet_forecast
+    return [prophet_forecast(history, horizon) for history in train]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--length", type=int, default=730)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--prophet-series", type=int, default=10,
+                        help="Prophet is fitted on this many of the series (0 to skip)")
+    args = parser.parse_args()
+
+    histories = synthetic_series(args.series, args.length + args.horizon)
+    train, actual = split(histories, args.horizon)
+
+    print(f"{'model':<16}{'series':>8}{'total s':>10}{'ms/series':>11}{'MAPE %':>9}{'cover %':>9}")
+    for model in FAST_MODELS:
+        start = time.perf_counter()
+        predictions = forecast_many(train, args.horizon, model)
+        elapsed = time.perf_counter() - start
+        mape, coverage = score(predictions, actual, args.horizon)
+        print(f"{model:<16}{len(train):>8}{elapsed:>10.2f}{elapsed / len(train) * 1000:>11.2f}{mape:>9.2f}{coverage:>9.1f}")
+
+    if args.prophet_series:
+        subset = slice(0, min(args.prophet_series, len(train)))
+        try:
+            start = time.perf_counter()
+            predictions = run_prophet(train[subset], args.horizon)
+        except ImportError:
+            print("prophet: not installed, skipped")
+            return
+        elapsed = time.perf_counter() - start
+        count = len(predictions)
+        mape, coverage = score(predictions, actual[subset], args.horizon)
+        print(f"{'prophet':<16}{count:>8}{elapsed:>10.2f}{elapsed / count * 1000:>11.2f}{mape:>9.2f}{coverage:>9.1f}")
+
+if __name__ == "__main__":
+    main()
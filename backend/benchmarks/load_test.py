@@ -0,0 +1,103 @@
+"""Measure concurrent request throughput and latency against a running API.
+
+Start the API (for example with 'uvicorn main:app --workers 1') and run from
+the backend directory:
+
+    python -m benchmarks.load_test --url http://localhost:8000 --concurrency 64 \\
+        --path /api/dashboard/stats --path /api/complaints/list --token $TOKEN
+
+To compare before and after a change, run the same command against a server
+started from each revision and pass --output to keep the JSON results.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def _request(url, token, timeout, data=None):
+    # A form body turns the request into a POST
+    request = urllib.request.Request(url, data=urllib.parse.urlencode(data).encode() if data else None)
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = 200 <= response.status < 400
+    except (urllib.error.URLError, TimeoutError, ConnectionError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+def run_load(base_url, path, concurrency=32, duration=10.0, token=None, timeout=30.0, data=None):
+    """Hammer one path from `concurrency` threads for `duration` seconds"""
+    url = base_url.rstrip("/") + path
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            latency, ok = _request(url, token, timeout, data)
+            with lock:
+                if ok:
+                    latencies.append(latency)
+                else:
+                    errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def percentile(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else None
+
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else None,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--concurrency", type=int, action="append", dest="levels",
+                        help="Repeat to sweep several concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'path':<40}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for path in args.paths or ["/"]:
+        for concurrency in args.levels or [1, 16, 64]:
+            result = run_load(args.url, path, concurrency, args.duration, args.token)
+            results.append(result)
+            print(
+                f"{path:<40}{concurrency:>6}{result['throughput_rps']:>10.1f}"
+                f"{result['p50_ms'] or 0:>10.1f}{result['p95_ms'] or 0:>10.1f}{result['errors']:>8}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
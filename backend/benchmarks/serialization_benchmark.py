@@ -0,0 +1,59 @@
+"""Compare list serialization paths on synthetic consumption rows.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization_benchmark --rows 100000
+
+Reports CPU time and payload size for per-row Pydantic models with the
+standard encoder against orjson rows and the columnar format, raw and
+compressed.
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import date, timedelta
+import brotli
+from fastapi.encoders import jsonable_encoder
+from routes.utilities import UtilityConsumptionResponse
+from services.serialization import list_response
+
+FIELDS = ["id", "building_id", "utility_type", "consumption_value", "unit", "recorded_date", "building_name"]
+
+def synthetic_rows(n):
+    start = date(2020, 1, 1)
+    return [
+        (i, i % 500, ("water", "electricity", "gas")[i % 3], 1000.0 + (i % 97) * 3.5,
+         ("liters", "kwh", "m3")[i % 3], start + timedelta(days=i % 1500), f"Building {i % 500}")
+        for i in range(n)
+    ]
+
+def pydantic_stdlib(rows):
+    models = [UtilityConsumptionResponse(**dict(zip(FIELDS, row))) for row in rows]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+def orjson_rows(rows):
+    return list_response(FIELDS, rows, "rows").body
+
+def orjson_columnar(rows):
+    return list_response(FIELDS, rows, "columnar").body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    print(f"{'path':<18}{'cpu ms':>10}{'raw KB':>10}{'gzip KB':>10}{'br KB':>10}")
+    for name, serialize in [("pydantic+json", pydantic_stdlib), ("orjson rows", orjson_rows),
+                            ("orjson columnar", orjson_columnar)]:
+        start = time.process_time()
+        body = serialize(rows)
+        elapsed = (time.process_time() - start) * 1000
+        print(
+            f"{name:<18}{elapsed:>10.0f}{len(body) / 1024:>10.0f}"
+            f"{len(gzip.compress(body, 6)) / 1024:>10.0f}{len(brotli.compress(body, quality=4)) / 1024:>10.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
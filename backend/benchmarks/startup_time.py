@@ -0,0 +1,82 @@
+"""Measure how long a fresh interpreter takes to import the API, and guard it.
+
+Run from the backend directory (no database is needed, since importing the
+app does not connect):
+
+    python -m benchmarks.startup_time --runs 5 --max-seconds 3
+
+Exits non-zero if any of the heavy ML libraries is loaded by the import, or
+if the median import time exceeds --max-seconds. --top lists the slowest
+modules from 'python -X importtime' to show where a regression came from.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Loaded on first use of forecasting, ingestion or prioritization, never at startup
+HEAVY_MODULES = ("pandas", "prophet", "sklearn", "joblib", "cmdstanpy", "pyarrow")
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+}}))
+"""
+
+def measure():
+    """Import main in a new interpreter and return (seconds, heavy modules loaded)"""
+    result = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["seconds"], report["loaded"]
+
+def slowest_imports(count):
+    """(cumulative microseconds, module) for the slowest imports of main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative), module))
+    return sorted(timings, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the median import is slower")
+    parser.add_argument("--top", type=int, default=0, help="List this many of the slowest imports")
+    args = parser.parse_args()
+
+    # The first run also warms the bytecode and page caches
+    measure()
+    runs = [measure() for _ in range(args.runs)]
+    seconds = [elapsed for elapsed, _ in runs]
+    loaded = sorted({name for _, names in runs for name in names})
+    median = statistics.median(seconds)
+    print(f"import main: median {median:.2f}s, min {min(seconds):.2f}s, max {max(seconds):.2f}s over {args.runs} runs")
+
+    if args.top:
+        print(f"\n{'cumulative ms':>14}  module")
+        for cumulative, module in slowest_imports(args.top):
+            print(f"{cumulative / 1000:>14.1f}  {module}")
+
+    failed = False
+    if loaded:
+        print(f"Heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"Median import time {median:.2f}s exceeds {args.max_seconds:.2f}s")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
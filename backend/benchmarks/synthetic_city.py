@@ -0,0 +1,272 @@
+"""Populate the database with a reproducible synthetic city for benchmarking.
+
+Start PostGIS with 'docker compose up -d postgres' (schema.sql is applied on
+first start) and run from the backend directory:
+
+    python -m benchmarks.synthetic_city --scale small --force
+
+Scales (each count can be overridden):
+
+    small    1,000 buildings    100k complaints     3M readings
+    medium   5,000 buildings      1M complaints    15M readings
+    large   10,000 buildings      5M complaints    50M readings
+
+Buildings cluster into neighbourhoods around the city centre, complaints
+concentrate on a heavy-tailed set of problem buildings, and readings follow
+yearly and weekly seasonality. The same --seed always produces the same
+city. Existing buildings, users, complaints and readings are truncated,
+hence --force. All users share the password given by --password; the admin
+is admin@city.test.
+"""
+import argparse
+import io
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from config.auth import get_password_hash
+from config.database import SessionLocal, engine
+from services.hotspots import rebuild_hotspots
+from services.rollups import backfill_rollups
+from services.auth import user_cache
+from services.dashboard import invalidate_dashboard
+from services.tiles import expire_layer
+from services.versions import bump_version
+
+SCALES = {
+    "small": {"buildings": 1000, "complaints": 100_000, "readings": 3_000_000},
+    "medium": {"buildings": 5000, "complaints": 1_000_000, "readings": 15_000_000},
+    "large": {"buildings": 10_000, "complaints": 5_000_000, "readings": 50_000_000},
+}
+CITY_CENTRE = (77.2090, 28.6139)
+KM_PER_DEGREE = 111.32
+COPY_CHUNK = 1_000_000
+
+CATEGORIES = ["electricity", "plumbing", "sewage", "maintenance", "other"]
+CATEGORY_WEIGHTS = [0.25, 0.25, 0.15, 0.25, 0.10]
+URGENCIES = ["low", "medium", "high", "critical"]
+URGENCY_WEIGHTS = [0.35, 0.35, 0.22, 0.08]
+URGENCY_SCORES = np.array([0.2, 0.4, 0.7, 1.0])
+UTILITIES = [("water", "liters", 15000.0), ("electricity", "kwh", 2500.0), ("gas", "m3", 300.0)]
+
+TABLES = [
+    "complaint_hotspots", "utility_consumption_rollups", "consumption_forecasts", "complaint_updates",
+    "complaints", "worker_profiles", "utility_consumption", "users", "buildings"
+]
+
+def _copy(db, table, columns, frame):
+    """COPY a DataFrame into table through the session's psycopg2 connection"""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False, na_rep="\\N")
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+    )
+
+def _points(lon, lat):
+    return pd.Series([f"SRID=4326;POINT({x:.6f} {y:.6f})" for x, y in zip(lon, lat)])
+
+def _offset(rng, n, sigma_km, lat):
+    """Gaussian lon/lat offsets with the given spread in kilometres"""
+    dlat = rng.normal(0, sigma_km, n) / KM_PER_DEGREE
+    dlon = rng.normal(0, sigma_km, n) / (KM_PER_DEGREE * np.cos(np.radians(lat)))
+    return dlon, dlat
+
+def generate_buildings(db, rng, n):
+    neighbourhoods = max(1, int(np.sqrt(n)))
+    centre_lon, centre_lat = CITY_CENTRE
+    dlon, dlat = _offset(rng, neighbourhoods, 6.0, centre_lat)
+    hood_lon, hood_lat = centre_lon + dlon, centre_lat + dlat
+    # Zipf-like neighbourhood sizes: a dense core and sparse suburbs
+    weights = 1.0 / np.arange(1, neighbourhoods + 1)
+    hood = rng.choice(neighbourhoods, n, p=weights / weights.sum())
+    dlon, dlat = _offset(rng, n, 0.4, centre_lat)
+    lon, lat = hood_lon[hood] + dlon, hood_lat[hood] + dlat
+
+    ids = np.arange(1, n + 1)
+    building_type = np.where(rng.random(n) < 0.8, "residential", "commercial")
+    frame = pd.DataFrame({
+        "id": ids,
+        "name": [f"Building {i}" for i in ids],
+        "address": [f"{i} Block {h + 1}, City" for i, h in zip(ids, hood)],
+        "location": _points(lon, lat),
+        "building_type": building_type
+    })
+    _copy(db, "buildings", frame.columns, frame)
+    return lon, lat
+
+def generate_users(db, rng, buildings, residents_per_building, workers, password_hash):
+    residents = buildings * residents_per_building
+    ids = np.arange(1, residents + workers + 2)
+    roles = np.array(["admin"] + ["resident"] * residents + ["worker"] * workers)
+    emails = ["admin@city.test"] + [f"resident{i}@city.test" for i in range(residents)] + \
+             [f"worker{i}@city.test" for i in range(workers)]
+    building_id = np.concatenate([[1], np.arange(residents) // residents_per_building + 1, np.zeros(workers)])
+    frame = pd.DataFrame({
+        "id": ids,
+        "email": emails,
+        "password_hash": password_hash,
+        "role": roles,
+        "first_name": [role.capitalize() for role in roles],
+        "last_name": [str(i) for i in ids],
+        "phone": None,
+        "building_id": pd.array(np.where(building_id > 0, building_id, np.nan), dtype="Int64")
+    })
+    _copy(db, "users", frame.columns, frame)
+    resident_ids = ids[1:residents + 1]
+    worker_ids = ids[residents + 1:]
+    return resident_ids, worker_ids
+
+def generate_worker_profiles(db, rng, worker_ids):
+    n = len(worker_ids)
+    dlon, dlat = _offset(rng, n, 5.0, CITY_CENTRE[1])
+    skills = [
+        "{" + ",".join(sorted(rng.choice(CATEGORIES, rng.integers(1, 4), replace=False))) + "}"
+        for _ in range(n)
+    ]
+    frame = pd.DataFrame({
+        "user_id": worker_ids,
+        "skills": skills,
+        "location": _points(CITY_CENTRE[0] + dlon, CITY_CENTRE[1] + dlat),
+        "max_open_complaints": rng.integers(5, 30, n),
+        "active": rng.random(n) < 0.95
+    })
+    _copy(db, "worker_profiles", frame.columns, frame)
+
+def generate_complaints(db, rng, n, building_lon, building_lat, resident_ids, worker_ids, days):
+    buildings = len(building_lon)
+    # A heavy tail of problem buildings produces realistic hotspots
+    weights = rng.lognormal(0, 1.5, buildings)
+    weights /= weights.sum()
+    now = datetime.now().replace(microsecond=0)
+
+    for start in range(0, n, COPY_CHUNK):
+        size = min(COPY_CHUNK, n - start)
+        building = rng.choice(buildings, size, p=weights)
+        dlon, dlat = _offset(rng, size, 0.03, CITY_CENTRE[1])
+        urgency = rng.choice(len(URGENCIES), size, p=URGENCY_WEIGHTS)
+        age = rng.random(size) * days
+        created_at = (now - pd.to_timedelta(age, unit="D")).floor("s")
+        # Older complaints are more likely to be resolved
+        progress = rng.random(size) + age / days
+        status = np.select(
+            [progress < 0.5, progress < 0.7, progress < 0.9, progress < 1.6],
+            ["open", "assigned", "in_progress", "resolved"], "closed"
+        )
+        assigned = status != "open"
+        worker = np.where(assigned, rng.choice(worker_ids, size), 0)
+        resolved = np.isin(status, ["resolved", "closed"])
+        resolved_at = (created_at + pd.to_timedelta(np.minimum(rng.exponential(3, size), age), unit="D")).floor("s")
+
+        frame = pd.DataFrame({
+            "user_id": rng.choice(resident_ids, size),
+            "building_id": building + 1,
+            "category": rng.choice(CATEGORIES, size, p=CATEGORY_WEIGHTS),
+            "title": "Synthetic complaint",
+            "description": "Generated for benchmarking",
+            "location": _points(building_lon[building] + dlon, building_lat[building] + dlat),
+            "urgency_level": np.array(URGENCIES)[urgency],
+            "status": status,
+            "assigned_worker_id": pd.array(np.where(assigned, worker, np.nan), dtype="Int64"),
+            "priority_score": np.round(URGENCY_SCORES[urgency] * 0.7 + rng.random(size) * 0.3, 4),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "resolved_at": pd.Series(resolved_at).where(resolved)
+        })
+        _copy(db, "complaints", frame.columns, frame)
+
+def generate_readings(db, rng, buildings, readings):
+    days = max(1, readings // (buildings * len(UTILITIES)))
+    end = date.today() - timedelta(days=1)
+    dates = pd.date_range(end=end, periods=days, freq="D")
+    yearly = 1 + 0.2 * np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365.25)
+    weekly = np.where(dates.dayofweek.to_numpy() >= 5, 0.9, 1.05)
+    shape = yearly * weekly
+    size = rng.lognormal(0, 0.5, buildings)
+    per_chunk = max(1, COPY_CHUNK // (days * len(UTILITIES)))
+
+    for first in range(0, buildings, per_chunk):
+        ids = np.arange(first, min(buildings, first + per_chunk))
+        frames = []
+        for utility_type, unit, base in UTILITIES:
+            values = (base * size[ids][:, None] * shape[None, :]) * rng.normal(1, 0.05, (len(ids), days))
+            frames.append(pd.DataFrame({
+                "building_id": np.repeat(ids + 1, days),
+                "utility_type": utility_type,
+                "consumption_value": np.round(np.maximum(values, 0).ravel(), 2),
+                "unit": unit,
+                "recorded_date": np.tile(dates.date, len(ids))
+            }))
+        frame = pd.concat(frames, ignore_index=True)
+        _copy(db, "utility_consumption", frame.columns, frame)
+        db.commit()
+    return days
+
+def generate_city(args):
+    rng = np.random.default_rng(args.seed)
+    scale = SCALES[args.scale]
+    buildings = args.buildings or scale["buildings"]
+    complaints = args.complaints or scale["complaints"]
+    readings = args.readings or scale["readings"]
+    workers = args.workers or max(10, buildings // 50)
+
+    db = SessionLocal()
+    try:
+        steps = []
+        def step(name, fn, *fn_args):
+            start = time.perf_counter()
+            result = fn(*fn_args)
+            db.commit()
+            steps.append((name, time.perf_counter() - start))
+            print(f"{name:<24}{steps[-1][1]:>8.1f}s")
+            return result
+
+        step("truncate", lambda: db.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")))
+        lon, lat = step("buildings", generate_buildings, db, rng, buildings)
+        resident_ids, worker_ids = step(
+            "users", generate_users, db, rng, buildings, args.residents_per_building, workers,
+            get_password_hash(args.password)
+        )
+        step("worker profiles", generate_worker_profiles, db, rng, worker_ids)
+        step("complaints", generate_complaints, db, rng, complaints, lon, lat, resident_ids, worker_ids, args.days)
+        step("readings", generate_readings, db, rng, buildings, readings)
+        for table in ("buildings", "users", "complaints", "utility_consumption"):
+            db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+        step("rollups", backfill_rollups, db)
+        step("hotspots", rebuild_hotspots, db)
+    finally:
+        db.close()
+
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE"))
+
+    # A running API must not keep serving the previous city from its caches
+    for layer in ("complaints", "buildings"):
+        expire_layer(layer)
+    invalidate_dashboard()
+    user_cache.clear()
+    bump_version("complaints", "buildings")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--buildings", type=int)
+    parser.add_argument("--complaints", type=int)
+    parser.add_argument("--readings", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--residents-per-building", type=int, default=2)
+    parser.add_argument("--days", type=int, default=365, help="Age of the oldest complaint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--force", action="store_true", help="Required: existing data is truncated")
+    args = parser.parse_args()
+
+    if not args.force:
+        parser.error("this replaces all buildings, users, complaints and readings; pass --force to proceed")
+    generate_city(args)
+
+if __name__ == "__main__":
+    main()
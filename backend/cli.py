@@ -0,0 +1,218 @@
+"""Command line entry point for offline jobs.
+
+Run from the backend directory, for example:
+
+    python cli.py forecast --model holt_winters --days 30
+
+The API does not touch the schema on startup; run 'python cli.py migrate'
+before starting it against a new database.
+"""
+import argparse
+import os
+import time
+from datetime import date
+from config.database import SessionLocal
+
+def migrate(args):
+    from sqlalchemy import text
+    from config.database import Base, engine
+    from models import User  # Import all models to ensure they're registered
+    
+    start = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        # Databases created before priority_score became NOT NULL
+        connection.execute(text("UPDATE complaints SET priority_score = 0 WHERE priority_score IS NULL"))
+        connection.execute(text(
+            "ALTER TABLE complaints ALTER COLUMN priority_score SET DEFAULT 0, "
+            "ALTER COLUMN priority_score SET NOT NULL"
+        ))
+        # Databases created before corrected readings changed the series version
+        connection.execute(text(
+            "ALTER TABLE utility_consumption ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP"
+        ))
+        # -infinity never matches a reading, so existing precomputed forecasts are refitted
+        connection.execute(text(
+            "ALTER TABLE consumption_forecasts ADD COLUMN IF NOT EXISTS history_updated_at TIMESTAMP NOT NULL DEFAULT '-infinity'"
+        ))
+        connection.execute(text("ALTER TABLE consumption_forecasts ALTER COLUMN history_updated_at DROP DEFAULT"))
+        # Databases with readings from before rollups existed
+        needs_rollups = connection.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM utility_consumption) "
+            "AND NOT EXISTS (SELECT 1 FROM utility_consumption_rollups)"
+        )).scalar()
+    elapsed = time.perf_counter() - start
+    print(f"Created missing tables and constraints in {elapsed:.1f}s")
+    
+    if needs_rollups:
+        rollups(argparse.Namespace(building_ids=None))
+
+def forecast(args):
+    from services.batch_forecast import run_batch_forecast
+    from services.forecasting import DEFAULT_FORECAST_MODEL
+    
+    model = args.model or DEFAULT_FORECAST_MODEL
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        summary = run_batch_forecast(
+            db,
+            days=args.days,
+            model=model,
+            workers=args.workers,
+            building_ids=args.building_ids,
+            utility_types=args.utility_types
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Forecast {summary['series']} series ({summary['rows']} rows) with {model} in {elapsed:.1f}s")
+
+def ingest(args):
+    from services.ingest import ingest_readings
+    
+    file_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        with open(args.path, "rb") as stream:
+            report = ingest_readings(db, stream, file_format, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(
+        f"Read {report['rows']} rows in {elapsed:.1f}s: {report['inserted']} inserted, "
+        f"{report['updated']} updated, {report['rejected']} rejected"
+    )
+    for reject in report["rejects"]:
+        print(f"  line {reject['line']}: {reject['error']}")
+
+def rollups(args):
+    from services.rollups import backfill_rollups
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        backfill_rollups(db, args.building_ids)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Rebuilt consumption rollups in {elapsed:.1f}s")
+
+def assign(args):
+    from services.assignment import assign_backlog
+    from services.dashboard import invalidate_dashboard
+    from services.tiles import expire_layer
+    from services.versions import bump_version
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        summary = assign_backlog(db, limit=args.limit)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    if summary["assigned"]:
+        # Reaches the API processes through the shared version store and caches (CACHE_BACKEND=redis)
+        expire_layer("complaints")
+        invalidate_dashboard()
+        bump_version("complaints")
+    print(
+        f"Assigned {summary['assigned']} of {summary['considered']} open complaints in {elapsed:.1f}s, "
+        f"{summary['unassigned']} left without a qualified worker"
+    )
+
+def hotspots(args):
+    from services.hotspots import rebuild_hotspots
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rebuild_hotspots(db)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Rebuilt complaint hotspot grid in {elapsed:.1f}s")
+
+def export(args):
+    from services.export import consumption_schema, complaint_schema, consumption_query, complaint_query, record_batches, write_export
+    
+    if args.dataset == "consumption":
+        query = consumption_query(args.building_ids, args.utility_types, args.start_date, args.end_date)
+        schema = consumption_schema()
+    else:
+        query = complaint_query(args.building_ids, args.categories, args.start_date, args.end_date)
+        schema = complaint_schema()
+    
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        write_export(record_batches(db, query, schema, args.batch_size), schema, args.output, args.format)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    print(f"Exported {args.dataset} to {args.output} in {elapsed:.1f}s")
+
+def worker(args):
+    from services.jobs import run_worker
+    
+    if os.getenv("JOB_BACKEND", "memory") != "redis":
+        raise SystemExit("The job worker consumes the Redis queue; set JOB_BACKEND=redis for the API and the worker")
+    print(f"Running jobs from Redis with {args.workers} processes")
+    run_worker(workers=args.workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="GIS Utility Management System jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    migrate_parser = commands.add_parser("migrate", help="Create missing tables and bring constraints up to date")
+    migrate_parser.set_defaults(handler=migrate)
+    
+    forecast_parser = commands.add_parser("forecast", help="Precompute consumption forecasts for all series")
+    forecast_parser.add_argument("--days", type=int, default=30)
+    forecast_parser.add_argument("--model", default=None, choices=["prophet", "holt_winters", "seasonal_naive"],
+                                 help="Defaults to DEFAULT_FORECAST_MODEL, the model predictions use")
+    forecast_parser.add_argument("--workers", type=int, default=None, help="Process count, defaults to available cores")
+    forecast_parser.add_argument("--building-id", dest="building_ids", type=int, action="append")
+    forecast_parser.add_argument("--utility-type", dest="utility_types", action="append")
+    forecast_parser.set_defaults(handler=forecast)
+    
+    ingest_parser = commands.add_parser("ingest", help="Bulk load meter readings from CSV or NDJSON")
+    ingest_parser.add_argument("path")
+    ingest_parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    ingest_parser.add_argument("--batch-size", type=int, default=50000)
+    ingest_parser.set_defaults(handler=ingest)
+    
+    rollups_parser = commands.add_parser("rollups", help="Backfill daily, weekly and monthly consumption rollups")
+    rollups_parser.add_argument("--building-id", dest="building_ids", type=int, action="append")
+    rollups_parser.set_defaults(handler=rollups)
+    
+    assign_parser = commands.add_parser("assign", help="Assign the backlog of unassigned complaints to workers")
+    assign_parser.add_argument("--limit", type=int, default=50000)
+    assign_parser.set_defaults(handler=assign)
+    
+    hotspots_parser = commands.add_parser("hotspots", help="Rebuild the complaint hotspot grid")
+    hotspots_parser.set_defaults(handler=hotspots)
+    
+    export_parser = commands.add_parser("export", help="Export readings or complaints to an Arrow or Parquet file")
+    export_parser.add_argument("dataset", choices=["consumption", "complaints"])
+    export_parser.add_argument("output")
+    export_parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    export_parser.add_argument("--building-id", dest="building_ids", type=int, action="append")
+    export_parser.add_argument("--utility-type", dest="utility_types", action="append")
+    export_parser.add_argument("--category", dest="categories", action="append")
+    export_parser.add_argument("--start-date", type=date.fromisoformat)
+    export_parser.add_argument("--end-date", type=date.fromisoformat)
+    export_parser.add_argument("--batch-size", type=int, default=65536)
+    export_parser.set_defaults(handler=export)
+    
+    worker_parser = commands.add_parser("worker", help="Run forecast, retraining and rescoring jobs from the Redis queue")
+    worker_parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_WORKERS", "2")), help="Process count")
+    worker_parser.set_defaults(handler=worker)
+    
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
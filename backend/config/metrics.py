@@ -0,0 +1,74 @@
+import atexit
+import os
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+# Set PROMETHEUS_MULTIPROC_DIR (an empty directory, cleared before start) when
+# running more than one worker process. Every process then writes its samples
+# there and /metrics serves the sum over all of them, not just the worker that
+# happened to take the scrape.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+if MULTIPROCESS:
+    # Drop this process's live gauges from the totals once it exits
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+def metrics_registry():
+    """The registry /metrics should render"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Connection checkouts that gave up after DB_POOL_TIMEOUT",
+    ["engine"]
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_OPEN = Gauge(
+    "db_pool_connections_open",
+    "Connections currently open, idle or checked out",
+    ["engine"],
+    multiprocess_mode="livesum"
+)
+
+# Per-request profile, labelled by route template so cardinality stays bounded.
+# Like the pool metrics, summed over all workers under PROMETHEUS_MULTIPROC_DIR.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+SQL_STATEMENTS_PER_REQUEST = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed while handling a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+)
+SQL_SECONDS_PER_REQUEST = Histogram(
+    "http_request_sql_seconds",
+    "Total time spent executing SQL while handling a request",
+    ["route"],
+    buckets=LATENCY_BUCKETS
+)
+SERIALIZATION_SECONDS_PER_REQUEST = Histogram(
+    "http_request_serialization_seconds",
+    "Time spent rendering response bodies while handling a request",
+    ["route"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
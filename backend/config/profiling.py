@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from config.metrics import (
+    HTTP_REQUEST_SECONDS, SQL_STATEMENTS_PER_REQUEST, SQL_SECONDS_PER_REQUEST, SERIALIZATION_SECONDS_PER_REQUEST
+)
+
+# The sampling profiler is off unless enabled here; requests then opt in
+# with an "X-Profile: 1" header and get an "X-Profile-File" header back
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+PROFILE_HEADER = b"x-profile"
+
+class RequestStats:
+    """Counters for one request; a single mutable object so that work in
+    threadpools and SQLAlchemy's greenlets, which run in copies of the
+    request's context, adds to the same totals"""
+    __slots__ = ("sql_statements", "sql_seconds", "serialization_seconds")
+
+    def __init__(self):
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def record_serialization(seconds: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.sql_statements += 1
+        stats.sql_seconds += time.perf_counter() - start
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+def instrument_engine(engine):
+    """Attribute SQL statements and execution time to the current request"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class StackSampler:
+    """Samples every thread's Python stack on a timer and counts them in
+    collapsed-stack form ("thread;outer;...;inner count"), which flamegraph.pl,
+    speedscope and inferno read directly.
+
+    The event loop is shared, so a sample taken while one request is profiled
+    also shows whatever else the process was doing at the time; profile on an
+    otherwise idle worker for a clean picture.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+# One profile at a time: concurrent samplers would each record the other's request too
+_profile_lock = threading.Lock()
+
+class ProfilingMiddleware:
+    """Records latency, SQL and serialization histograms per route template
+    and, when enabled, samples a flame-graph profile of requests that ask for one"""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None
+
+    def _route(self, scope):
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        # Unmatched paths share one label so scanners cannot grow the series
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    def _start_profile(self, scope):
+        if not PROFILING_ENABLED or dict(scope["headers"]).get(PROFILE_HEADER) != b"1":
+            return None, None
+        if not _profile_lock.acquire(blocking=False):
+            return None, None
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}.folded"
+        return StackSampler().start(), name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        sampler, profile_name = self._start_profile(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if sampler is not None:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-profile-file", profile_name.encode())
+                    ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = self._route(scope)
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(elapsed)
+            SQL_STATEMENTS_PER_REQUEST.labels(route).observe(stats.sql_statements)
+            SQL_SECONDS_PER_REQUEST.labels(route).observe(stats.sql_seconds)
+            SERIALIZATION_SECONDS_PER_REQUEST.labels(route).observe(stats.serialization_seconds)
+            if sampler is not None:
+                try:
+                    sampler.stop()
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    sampler.write(os.path.join(PROFILE_DIR, profile_name))
+                finally:
+                    _profile_lock.release()
@@ -1,17 +1,28 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from config.database import get_db, engine, Base
-from config.auth import verify_token
-from routes import auth, complaints, buildings, utilities, dashboard
-from models import User  # Import all models to ensure they're registered
+from brotli_asgi import BrotliMiddleware
+from config.database import engine, async_engine
+from config.metrics import metrics_registry
+from config.profiling import ProfilingMiddleware, instrument_engine
+from routes import auth, complaints, buildings, utilities, dashboard, tiles, events, jobs
+from ml.complaint_prioritizer import get_prioritizer
+from services.serialization import TimedORJSONResponse
+from services.jobs import job_queue
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import os
 import uvicorn
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+app = FastAPI(title="GIS Utility Management System", version="1.0.0", default_response_class=TimedORJSONResponse)
 
-app = FastAPI(title="GIS Utility Management System", version="1.0.0")
+# Brotli, or gzip for clients without it, for responses above the size threshold.
+# Live event streams are excluded so events are not held back in the compressor,
+# and columnar exports because Parquet is already compressed.
+app.add_middleware(
+    BrotliMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    gzip_fallback=True,
+    excluded_handlers=["^/api/events/", "/export$"]
+)
 
 # CORS middleware
 app.add_middleware(
@@ -20,21 +31,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-File"],
 )
 
-security = HTTPBearer()
+# Per-route latency, SQL and serialization histograms for /metrics. Added last
+# so it wraps the other middleware and latency includes compression.
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(ProfilingMiddleware)
+
+# Heavy ML libraries load on first use. Set PRELOAD_MODELS to pay that cost at
+# startup instead of on the first complaint, for long-lived workers.
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() in ("1", "true", "yes")
 
-# Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    email = verify_token(token)
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
+@app.on_event("startup")
+async def load_models():
+    if PRELOAD_MODELS:
+        get_prioritizer()
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    job_queue.shutdown()
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -42,10 +59,17 @@ app.include_router(complaints.router, prefix="/api/complaints", tags=["Complaint
 app.include_router(buildings.router, prefix="/api/buildings", tags=["Buildings"])
 app.include_router(utilities.router, prefix="/api/utilities", tags=["Utilities"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(tiles.router, prefix="/api/tiles", tags=["Tiles"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 @app.get("/")
 async def root():
     return {"message": "GIS Utility Management System API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
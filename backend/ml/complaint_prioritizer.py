@@ -1,18 +1,60 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
-import joblib
+import numpy as np
 import os
+import threading
+
+MODEL_DIR = os.getenv("MODEL_DIR", ".")
+MODEL_PATH = os.path.join(MODEL_DIR, 'complaint_priority_model.pkl')
+CATEGORY_ENCODER_PATH = os.path.join(MODEL_DIR, 'category_encoder.pkl')
+URGENCY_ENCODER_PATH = os.path.join(MODEL_DIR, 'urgency_encoder.pkl')
 
 class ComplaintPrioritizer:
+    urgency_scores = {
+        'critical': 90,
+        'high': 70,
+        'medium': 50,
+        'low': 30
+    }
+    
+    category_multipliers = {
+        'electricity': 1.2,
+        'plumbing': 1.1,
+        'sewage': 1.3,
+        'maintenance': 1.0,
+        'other': 0.9
+    }
+    
+    # scikit-learn, joblib and pandas are imported by the methods that need them,
+    # so an untrained prioritizer scores complaints without loading them at all
     def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.category_encoder = LabelEncoder()
-        self.urgency_encoder = LabelEncoder()
+        self.model = None
+        self.category_encoder = None
+        self.urgency_encoder = None
         self.is_trained = False
+    
+    def load_model(self):
+        """Load trained artifacts if present, memory-mapping the model's arrays"""
+        paths = (MODEL_PATH, CATEGORY_ENCODER_PATH, URGENCY_ENCODER_PATH)
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        
+        import joblib
+        # mmap_mode shares the forest's node arrays between worker processes via the page cache
+        self.model = joblib.load(MODEL_PATH, mmap_mode='r')
+        self.category_encoder = joblib.load(CATEGORY_ENCODER_PATH)
+        self.urgency_encoder = joblib.load(URGENCY_ENCODER_PATH)
+        self.is_trained = True
+        return True
         
     def train_model(self, training_data):
         """Train the priority prediction model"""
+        import joblib
+        import pandas as pd
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import LabelEncoder
+        
+        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self.category_encoder = LabelEncoder()
+        self.urgency_encoder = LabelEncoder()
         df = pd.DataFrame(training_data)
         
         # Encode categorical variables
@@ -27,10 +69,16 @@ class ComplaintPrioritizer:
         self.model.fit(X, y)
         self.is_trained = True
         
-        # Save model
-        joblib.dump(self.model, 'complaint_priority_model.pkl')
-        joblib.dump(self.category_encoder, 'category_encoder.pkl')
-        joblib.dump(self.urgency_encoder, 'urgency_encoder.pkl')
+        # Save model; write then rename so processes reloading it never see a partial file.
+        # The urgency encoder goes last since get_prioritizer watches it for changes.
+        for artifact, path in (
+            (self.model, MODEL_PATH),
+            (self.category_encoder, CATEGORY_ENCODER_PATH),
+            (self.urgency_encoder, URGENCY_ENCODER_PATH)
+        ):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(artifact, tmp_path)
+            os.replace(tmp_path, path)
     
     def calculate_priority(self, complaint_data):
         """Calculate priority score for a new complaint"""
@@ -49,24 +97,62 @@ class ComplaintPrioritizer:
         except:
             return self._default_priority_score(complaint_data)
     
-    def _default_priority_score(self, complaint_data):
-        """Default priority scoring when ML model is not available"""
-        urgency_scores = {
-            'critical': 90,
-            'high': 70,
-            'medium': 50,
-            'low': 30
-        }
+    def calculate_priority_batch(self, complaints):
+        """Score a DataFrame with category and urgency_level columns in one pass"""
+        defaults = self._default_priority_scores(complaints)
+        if not self.is_trained or complaints.empty:
+            return defaults
         
-        category_multipliers = {
-            'electricity': 1.2,
-            'plumbing': 1.1,
-            'sewage': 1.3,
-            'maintenance': 1.0,
-            'other': 0.9
-        }
+        # Map labels directly so unseen values fall back instead of raising
+        category_codes = complaints['category'].map(
+            {label: code for code, label in enumerate(self.category_encoder.classes_)}
+        )
+        urgency_codes = complaints['urgency_level'].map(
+            {label: code for code, label in enumerate(self.urgency_encoder.classes_)}
+        )
+        known = (category_codes.notna() & urgency_codes.notna()).to_numpy()
         
-        base_score = urgency_scores.get(complaint_data['urgency_level'], 50)
-        multiplier = category_multipliers.get(complaint_data['category'], 1.0)
+        scores = defaults.copy()
+        if known.any():
+            import pandas as pd
+            features = pd.DataFrame({
+                'category_encoded': category_codes[known].astype(int),
+                'urgency_encoded': urgency_codes[known].astype(int)
+            })
+            scores[known] = np.clip(self.model.predict(features), 0, 100)
+        return scores
+    
+    def _default_priority_score(self, complaint_data):
+        """Default priority scoring when ML model is not available"""
+        base_score = self.urgency_scores.get(complaint_data['urgency_level'], 50)
+        multiplier = self.category_multipliers.get(complaint_data['category'], 1.0)
         
         return min(100, base_score * multiplier)
+    
+    def _default_priority_scores(self, complaints):
+        base_scores = complaints['urgency_level'].map(self.urgency_scores).fillna(50)
+        multipliers = complaints['category'].map(self.category_multipliers).fillna(1.0)
+        return np.minimum(100, (base_scores * multipliers).to_numpy(dtype=float))
+
+_prioritizer = None
+_prioritizer_version = None
+_prioritizer_lock = threading.Lock()
+
+def _artifact_version():
+    try:
+        return os.stat(URGENCY_ENCODER_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def get_prioritizer():
+    """Return the process-wide prioritizer, loading trained artifacts on first use
+    and again whenever a retraining job replaces them"""
+    global _prioritizer, _prioritizer_version
+    version = _artifact_version()
+    if _prioritizer is None or version != _prioritizer_version:
+        with _prioritizer_lock:
+            if _prioritizer is None or version != _prioritizer_version:
+                prioritizer = ComplaintPrioritizer()
+                prioritizer.load_model()
+                _prioritizer, _prioritizer_version = prioritizer, version
+    return _prioritizer
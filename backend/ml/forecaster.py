@@ -0,0 +1,199 @@
+import warnings
+import numpy as np
+from itertools import product
+
+FAST_MODELS = ("holt_winters", "seasonal_naive")
+
+SEASON_LENGTH = 7  # Daily readings with weekly seasonality
+MAX_HISTORY = 3 * 365
+# Pandas frequency and season length for each supported series granularity
+FREQUENCIES = {
+    "day": ("D", SEASON_LENGTH),
+    "week": ("W-MON", 52),
+    "month": ("MS", 12)
+}
+# Quantiles of the empirical residuals; 80% matches Prophet's default interval_width
+INTERVAL = (0.1, 0.9)
+
+# Candidate (alpha, beta, gamma) smoothing parameters, evaluated for every series at once
+HW_PARAM_GRID = np.array(list(product(
+    (0.1, 0.3, 0.5, 0.8),
+    (0.0, 0.05, 0.2),
+    (0.05, 0.2, 0.5)
+)))
+# Series per parameter search batch; bounds memory at GRID_CHUNK * len(HW_PARAM_GRID) rows
+GRID_CHUNK = 1024
+
+def to_matrix(histories, freq="D", max_history=MAX_HISTORY):
+    """Stack ds/y histories into a right-aligned matrix at the given frequency.
+
+    Each row covers one series from its first to its last reading, with missing
+    periods as NaN and shorter series left-padded with NaN. Returns the matrix
+    and the last recorded timestamp of each series.
+    """
+    import pandas as pd
+
+    rows = []
+    last_dates = []
+    for history in histories:
+        series = pd.Series(
+            history['y'].to_numpy(dtype=float),
+            index=pd.to_datetime(history['ds'])
+        ).groupby(level=0).mean().asfreq(freq)
+        rows.append(series.to_numpy()[-max_history:])
+        last_dates.append(series.index[-1])
+
+    width = max(len(row) for row in rows)
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, width - len(row):] = row
+    return matrix, last_dates
+
+def _first_valid(Y):
+    valid = ~np.isnan(Y)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), Y.shape[1])
+
+def _holt_winters_pass(Y, alpha, beta, gamma, m, keep_residuals=True):
+    """Run additive Holt-Winters over every row of Y, one vectorized step per day.
+
+    Returns the final level, trend and seasonal state plus the one-step-ahead
+    residuals, or only their sum of squares when keep_residuals is False.
+    """
+    n, T = Y.shape
+    start = _first_valid(Y)
+    # Initialise from the first two seasons of each series
+    window = start[:, None] + np.arange(2 * m)
+    initial = np.where(window < T, Y[np.arange(n)[:, None], np.minimum(window, T - 1)], np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        first_mean = np.nan_to_num(np.nanmean(initial[:, :m], axis=1))
+        trend = np.nan_to_num((np.nanmean(initial[:, m:], axis=1) - first_mean) / m)
+    # The first season's mean sits at its midpoint; the recursion starts after
+    # its last step, so carry the level there and take the trend ramp out of
+    # the initial seasonals
+    ramp = trend[:, None] * (np.arange(m) - (m - 1) / 2)
+    level = first_mean + trend * (m - 1) / 2
+    season = np.zeros((n, m))
+    season[np.arange(n)[:, None], window[:, :m] % m] = np.nan_to_num(initial[:, :m] - first_mean[:, None] - ramp)
+
+    residuals = np.full((n, T), np.nan) if keep_residuals else None
+    sse = np.zeros(n)
+    for t in range(T):
+        started = t >= start + m
+        y = Y[:, t]
+        observed = started & ~np.isnan(y)
+        s = season[:, t % m]
+
+        error = np.where(observed, y - (level + trend + s), 0.0)
+        sse += error ** 2
+        if keep_residuals:
+            residuals[:, t] = np.where(observed, error, np.nan)
+
+        new_level = np.where(observed, alpha * (y - s) + (1 - alpha) * (level + trend), level + trend)
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, t % m] = np.where(observed, gamma * (y - new_level) + (1 - gamma) * s, s)
+        level = np.where(started, new_level, level)
+        trend = np.where(started, new_trend, trend)
+
+    return level, trend, season, (residuals if keep_residuals else sse)
+
+def _intervals(yhat, residuals, scale):
+    """Widen the residual quantiles by scale, an (n_series, horizon) or (horizon,) array"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        lower_q, upper_q = np.nanquantile(residuals, INTERVAL, axis=1)
+    # Keep the point forecast inside its interval even when residuals are biased
+    lower_q = np.minimum(np.nan_to_num(lower_q), 0)
+    upper_q = np.maximum(np.nan_to_num(upper_q), 0)
+    scale = np.broadcast_to(scale, yhat.shape)
+    lower = yhat + lower_q[:, None] * scale
+    upper = yhat + upper_q[:, None] * scale
+    return lower, upper
+
+def _holt_winters_scale(alpha, beta, gamma, horizon, m):
+    """Growth of the h-step forecast error relative to the one-step error.
+
+    The additive Holt-Winters variance is sigma^2 * (1 + sum_{j<h} c_j^2) with
+    c_j = alpha * (1 + j * beta) + gamma when j is a whole number of seasons
+    (Hyndman et al., class 1 models; beta here is the trend smoothing applied
+    to level changes, hence the alpha factor). sqrt(h) would assume a random
+    walk, which overstates the spread of a well-smoothed series several-fold.
+    """
+    j = np.arange(1, horizon)[None, :]
+    c = alpha[:, None] * (1 + j * beta[:, None]) + gamma[:, None] * (j % m == 0)
+    variance = 1 + np.concatenate([np.zeros((len(alpha), 1)), np.cumsum(c ** 2, axis=1)], axis=1)
+    return np.sqrt(variance)
+
+def holt_winters(Y, horizon, season_length=SEASON_LENGTH):
+    """Additive Holt-Winters forecasts for every row of Y.
+
+    Smoothing parameters are chosen per series from HW_PARAM_GRID by in-sample
+    one-step squared error; all candidates are evaluated in a single pass.
+    Returns (yhat, lower, upper), each of shape (n_series, horizon).
+    """
+    n, T = Y.shape
+    season_length = max(1, min(season_length, T // 2))
+    k = len(HW_PARAM_GRID)
+    best = np.empty((n, 3))
+    for lo in range(0, n, GRID_CHUNK):
+        chunk = Y[lo:lo + GRID_CHUNK]
+        rows = len(chunk)
+        alpha, beta, gamma = (np.tile(HW_PARAM_GRID[:, i], rows) for i in range(3))
+        _, _, _, sse = _holt_winters_pass(
+            np.repeat(chunk, k, axis=0), alpha, beta, gamma, season_length, keep_residuals=False
+        )
+        best[lo:lo + rows] = HW_PARAM_GRID[sse.reshape(rows, k).argmin(axis=1)]
+
+    level, trend, season, residuals = _holt_winters_pass(Y, best[:, 0], best[:, 1], best[:, 2], season_length)
+
+    steps = np.arange(1, horizon + 1)
+    phases = (T - 1 + steps) % season_length
+    yhat = level[:, None] + trend[:, None] * steps[None, :] + season[:, phases]
+    scale = _holt_winters_scale(best[:, 0], best[:, 1], best[:, 2], horizon, season_length)
+    lower, upper = _intervals(yhat, residuals, scale)
+    return yhat, lower, upper
+
+def seasonal_naive(Y, horizon, season_length=SEASON_LENGTH):
+    """Repeat the last observed season, with intervals from seasonal-difference residuals"""
+    import pandas as pd
+
+    n, T = Y.shape
+    season_length = max(1, min(season_length, T // 2))
+    last_season = pd.DataFrame(Y[:, T - season_length:].T).ffill().bfill().to_numpy().T
+
+    steps = np.arange(1, horizon + 1)
+    yhat = last_season[:, (steps - 1) % season_length]
+    residuals = Y[:, season_length:] - Y[:, :-season_length]
+    lower, upper = _intervals(yhat, residuals, np.sqrt(np.ceil(steps / season_length)))
+    return yhat, lower, upper
+
+def forecast_many(histories, periods, model="holt_winters", granularity="day"):
+    """Forecast many ds/y histories in one vectorized pass.
+
+    Returns one list of prediction dicts per history, in the same shape as the
+    Prophet forecasts.
+    """
+    import pandas as pd
+
+    freq, season_length = FREQUENCIES[granularity]
+    Y, last_dates = to_matrix(histories, freq)
+    if model == "holt_winters":
+        yhat, lower, upper = holt_winters(Y, periods, season_length)
+    elif model == "seasonal_naive":
+        yhat, lower, upper = seasonal_naive(Y, periods, season_length)
+    else:
+        raise ValueError(f"Unknown forecasting model: {model}")
+
+    forecasts = []
+    for i, last_date in enumerate(last_dates):
+        dates = pd.date_range(last_date, periods=periods + 1, freq=freq)[1:]
+        forecasts.append([
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'predicted_value': float(yhat[i, step]),
+                'lower_bound': float(lower[i, step]),
+                'upper_bound': float(upper[i, step])
+            }
+            for step, day in enumerate(dates)
+        ])
+    return forecasts
@@ -18,7 +18,8 @@ class Complaint(Base):
     status = Column(String, nullable=False, default="open")
     assigned_worker_id = Column(Integer, ForeignKey("users.id"))
     image_url = Column(String)
-    priority_score = Column(Float, default=0)
+    # NOT NULL: a NULL would end keyset pagination on (priority_score, created_at, id)
+    priority_score = Column(Float, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True))
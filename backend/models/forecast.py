@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Date, UniqueConstraint
+from sqlalchemy.sql import func
+from config.database import Base
+
+class ConsumptionForecast(Base):
+    __tablename__ = "consumption_forecasts"
+    __table_args__ = (
+        UniqueConstraint("building_id", "utility_type", "model", "forecast_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
+    utility_type = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    forecast_date = Column(Date, nullable=False)
+    predicted_value = Column(Float, nullable=False)
+    lower_bound = Column(Float, nullable=False)
+    upper_bound = Column(Float, nullable=False)
+    # Version of the history the forecast was fitted on, see services.forecasting.series_version
+    history_end = Column(Date, nullable=False)
+    history_rows = Column(Integer, nullable=False)
+    history_updated_at = Column(DateTime(timezone=True), nullable=False)
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Date, PrimaryKeyConstraint
+from config.database import Base
+
+class ComplaintHotspot(Base):
+    """Complaint counts per category, day and Web Mercator grid cell, maintained by services.hotspots"""
+    __tablename__ = "complaint_hotspots"
+    __table_args__ = (
+        PrimaryKeyConstraint("category", "day", "cell_x", "cell_y"),
+    )
+    
+    category = Column(String, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    cell_x = Column(Integer, nullable=False)
+    cell_y = Column(Integer, nullable=False)
+    complaint_count = Column(Integer, nullable=False)
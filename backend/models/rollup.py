@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date, PrimaryKeyConstraint
+from config.database import Base
+
+class ConsumptionRollup(Base):
+    """Per-period aggregates of utility_consumption, maintained by services.rollups"""
+    __tablename__ = "utility_consumption_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint("building_id", "utility_type", "granularity", "period_start"),
+    )
+    
+    building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
+    utility_type = Column(String, nullable=False)
+    granularity = Column(String, nullable=False)  # day, week or month
+    period_start = Column(Date, nullable=False)
+    reading_count = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    # Regression sums over x = days since ROLLUP_EPOCH, so slopes can be merged across periods
+    sum_x = Column(Float, nullable=False)
+    sum_xx = Column(Float, nullable=False)
+    sum_xy = Column(Float, nullable=False)
+    first_date = Column(Date, nullable=False)
+    first_value = Column(Float, nullable=False)
+    last_date = Column(Date, nullable=False)
+    last_value = Column(Float, nullable=False)
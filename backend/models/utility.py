@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Date
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Date, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from config.database import Base
 
 class UtilityConsumption(Base):
     __tablename__ = "utility_consumption"
+    __table_args__ = (
+        UniqueConstraint("building_id", "utility_type", "recorded_date", name="uq_utility_consumption_reading"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     building_id = Column(Integer, ForeignKey("buildings.id"))
@@ -13,6 +16,8 @@ class UtilityConsumption(Base):
     unit = Column(String, nullable=False)
     recorded_date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set again when ingestion corrects a reading, so corrections change the series version
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # Relationships
     building = relationship("Building", back_populates="utility_consumption")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY
+from geoalchemy2 import Geometry
+from config.database import Base
+
+class WorkerProfile(Base):
+    """Dispatch details for a worker user, used by services.assignment"""
+    __tablename__ = "worker_profiles"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Complaint categories the worker can handle
+    skills = Column(ARRAY(String), nullable=False, default=list)
+    # Home base or last known position
+    location = Column(Geometry('POINT', srid=4326))
+    max_open_complaints = Column(Integer, nullable=False, default=10)
+    active = Column(Boolean, nullable=False, default=True)
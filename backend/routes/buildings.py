@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from pydantic import BaseModel
-from typing import List
-from config.database import get_db
+from typing import List, Optional
+from config.database import get_async_db
 from models.building import Building
-from models.user import User
+from services.auth import CurrentUser, get_current_user
+from services.spatial import apply_spatial_filters
+from services.tiles import invalidate_point
+from services.dashboard import invalidate_dashboard
+from services.versions import bump_version, conditional_get
 
 router = APIRouter()
 
@@ -24,21 +28,25 @@ class BuildingCreate(BaseModel):
     longitude: float
     building_type: str
 
-async def get_current_user(db: Session = Depends(get_db)):
-    # This should be imported from main.py or auth
-    # For now, return a dummy user
-    return db.query(User).first()
-
-@router.get("/list", response_model=List[BuildingResponse])
+@router.get("/list", response_model=List[BuildingResponse], dependencies=[Depends(conditional_get("buildings"))])
 async def get_buildings(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    bbox: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius: Optional[float] = Query(None, gt=0),
+    nearest: Optional[int] = Query(None, ge=1, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    buildings = db.query(
+    query = select(
         Building,
         func.ST_X(Building.location).label('longitude'),
         func.ST_Y(Building.location).label('latitude')
-    ).all()
+    )
+    query, _ = apply_spatial_filters(
+        query, Building.location, bbox=bbox, lat=lat, lon=lon, radius=radius, nearest=nearest
+    )
+    buildings = await db.execute(query)
     
     result = []
     for building, lon, lat in buildings:
@@ -56,8 +64,8 @@ async def get_buildings(
 @router.post("/create", response_model=dict)
 async def create_building(
     building: BuildingCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     location_point = func.ST_GeomFromText(f'POINT({building.longitude} {building.latitude})', 4326)
     
@@ -69,7 +77,10 @@ async def create_building(
     )
     
     db.add(db_building)
-    db.commit()
-    db.refresh(db_building)
+    await db.commit()
+    await db.refresh(db_building)
+    invalidate_point("buildings", building.longitude, building.latitude)
+    invalidate_dashboard()
+    bump_version("buildings")
     
     return {"message": "Building created successfully", "building_id": db_building.id}
@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import aliased
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
-from config.database import get_db
+from datetime import date, datetime
+from config.database import get_async_db, AsyncSessionLocal
 from models.complaint import Complaint, ComplaintUpdate
 from models.user import User
-from ml.complaint_prioritizer import ComplaintPrioritizer
+from models.building import Building
+from services.auth import CurrentUser, get_current_user
+from ml.complaint_prioritizer import get_prioritizer
+from services.spatial import apply_spatial_filters
+from services.tiles import invalidate_point
+from services.dashboard import invalidate_dashboard
+from services.assignment import BACKLOG_LIMIT, MAX_BACKLOG_LIMIT, assign_complaint
+from services.hotspots import record_complaint
+from services.events import broker, complaint_event
+from services.versions import bump_version
+from services.serialization import TimedORJSONResponse, check_format, list_response
+from services.jobs import JobStatus, job_location, submit_job
+from services.export import EXPORT_FORMATS, MEDIA_TYPES, complaint_schema, complaint_query, export_response_body
+import base64
 import json
+import orjson
 
 router = APIRouter()
 
+STREAM_BATCH_SIZE = 1000
+
 class ComplaintCreate(BaseModel):
     category: str
     title: str
@@ -43,8 +61,8 @@ class ComplaintUpdateCreate(BaseModel):
 @router.post("/create", response_model=dict)
 async def create_complaint(
     complaint: ComplaintCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Create complaint with PostGIS point
     location_point = func.ST_GeomFromText(f'POINT({complaint.longitude} {complaint.latitude})', 4326)
@@ -60,33 +78,90 @@ async def create_complaint(
     )
     
     # Calculate priority score using ML
-    prioritizer = ComplaintPrioritizer()
-    priority_score = prioritizer.calculate_priority(complaint.dict())
+    priority_score = get_prioritizer().calculate_priority(complaint.dict())
     db_complaint.priority_score = priority_score
     
     db.add(db_complaint)
-    db.commit()
-    db.refresh(db_complaint)
+    await db.flush()
+    await db.run_sync(record_complaint, db_complaint.id)
+    await db.commit()
+    await db.refresh(db_complaint)
     
     # Auto-assign worker if available
-    await auto_assign_worker(db_complaint.id, db)
+    worker_id = await auto_assign_worker(db_complaint.id, db)
+    invalidate_point("complaints", complaint.longitude, complaint.latitude)
+    invalidate_dashboard()
+    bump_version("complaints")
+    
+    event = complaint_event("complaint_created", db_complaint)
+    if worker_id is not None:
+        event.update(status="assigned", assigned_worker_id=worker_id)
+    await broker.publish(event)
     
     return {"message": "Complaint created successfully", "complaint_id": db_complaint.id}
 
+def _encode_cursor(priority_score, created_at, complaint_id):
+    raw = json.dumps([priority_score, created_at.isoformat(), complaint_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        priority_score, created_at, complaint_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(priority_score), datetime.fromisoformat(created_at), int(complaint_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _complaint_list_query():
+    """Select exactly the ComplaintResponse columns, names resolved by joins in the same statement"""
+    reporter = aliased(User, name="reporter")
+    worker = aliased(User, name="worker")
+    return select(
+        Complaint.id,
+        Complaint.category,
+        Complaint.title,
+        Complaint.description,
+        func.ST_Y(Complaint.location).label('latitude'),
+        func.ST_X(Complaint.location).label('longitude'),
+        Complaint.urgency_level,
+        Complaint.status,
+        Complaint.priority_score,
+        Complaint.created_at,
+        func.concat_ws(' ', reporter.first_name, reporter.last_name).label('user_name'),
+        func.coalesce(Building.name, '').label('building_name'),
+        func.nullif(func.concat_ws(' ', worker.first_name, worker.last_name), '').label('assigned_worker_name')
+    ).select_from(Complaint).join(
+        reporter, Complaint.user_id == reporter.id
+    ).outerjoin(
+        Building, Complaint.building_id == Building.id
+    ).outerjoin(
+        worker, Complaint.assigned_worker_id == worker.id
+    )
+
+async def _stream_complaints(query):
+    """Yield complaints as NDJSON lines from a server-side cursor"""
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for row in rows:
+            yield orjson.dumps(dict(row._mapping)) + b"\n"
+
 @router.get("/list", response_model=List[ComplaintResponse])
 async def get_complaints(
     status: Optional[str] = None,
     category: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    stream: bool = False,
+    bbox: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius: Optional[float] = Query(None, gt=0),
+    nearest: Optional[int] = Query(None, ge=1, le=1000),
+    format: str = "rows",
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(
-        Complaint,
-        User.first_name.label('user_first_name'),
-        User.last_name.label('user_last_name'),
-        func.ST_X(Complaint.location).label('longitude'),
-        func.ST_Y(Complaint.location).label('latitude')
-    ).join(User, Complaint.user_id == User.id)
+    check_format(format)
+    query = _complaint_list_query()
     
     if current_user.role == "resident":
         query = query.filter(Complaint.user_id == current_user.id)
@@ -98,36 +173,104 @@ async def get_complaints(
     if category:
         query = query.filter(Complaint.category == category)
     
-    results = query.all()
-    
-    complaints = []
-    for complaint, user_first, user_last, lon, lat in results:
-        complaints.append(ComplaintResponse(
-            id=complaint.id,
-            category=complaint.category,
-            title=complaint.title,
-            description=complaint.description,
-            latitude=lat,
-            longitude=lon,
-            urgency_level=complaint.urgency_level,
-            status=complaint.status,
-            priority_score=complaint.priority_score,
-            created_at=complaint.created_at,
-            user_name=f"{user_first} {user_last}",
-            building_name="",  # Add building name logic
-            assigned_worker_name=None  # Add worker name logic
-        ))
-    
-    return complaints
+    query, by_distance = apply_spatial_filters(
+        query, Complaint.location, bbox=bbox, lat=lat, lon=lon, radius=radius, nearest=nearest
+    )
+    if by_distance:
+        # k-nearest results are ordered by distance and are not paginated
+        results = await db.execute(query)
+        return list_response(results.keys(), results.all(), format)
+    
+    # Keyset pagination on (priority_score, created_at, id), highest priority first
+    if cursor:
+        query = query.filter(
+            tuple_(Complaint.priority_score, Complaint.created_at, Complaint.id) < tuple_(*_decode_cursor(cursor))
+        )
+    query = query.order_by(
+        Complaint.priority_score.desc(),
+        Complaint.created_at.desc(),
+        Complaint.id.desc()
+    )
+    
+    if stream:
+        return StreamingResponse(_stream_complaints(query), media_type="application/x-ndjson")
+    
+    results = await db.execute(query.limit(limit + 1))
+    fields, rows = results.keys(), results.all()
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last.priority_score, last.created_at, last.id)
+    
+    return list_response(fields, rows, format, headers)
+
+@router.get("/export")
+async def export_complaints(
+    format: str = "arrow",
+    building_id: Optional[List[int]] = Query(None),
+    category: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream complaints as an Arrow IPC stream or Parquet file in constant memory"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    
+    query = complaint_query(building_id, category, start_date, end_date)
+    return StreamingResponse(
+        export_response_body(query, complaint_schema(), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="complaints.{format}"'}
+    )
+
+@router.post("/rescore", status_code=202)
+async def rescore_complaints(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Queue a job recomputing priority scores for all open complaints"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await submit_job("rescore", {}, current_user)
+    return TimedORJSONResponse(
+        {"message": "Rescoring queued", "job": JobStatus(**job).dict()},
+        status_code=202,
+        headers=job_location(job)
+    )
+
+@router.post("/assign-backlog", status_code=202)
+async def assign_complaint_backlog(
+    limit: int = Query(BACKLOG_LIMIT, ge=1, le=MAX_BACKLOG_LIMIT),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Queue a job assigning every unassigned open complaint to a worker in one optimization pass.
+
+    The planning is CPU-bound and large backlogs take a while, so it runs in
+    the job pool; the job's result is the assignment summary.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await submit_job("assign_backlog", {"limit": limit}, current_user)
+    return TimedORJSONResponse(
+        {"message": "Backlog assignment queued", "job": JobStatus(**job).dict()},
+        status_code=202,
+        headers=job_location(job)
+    )
 
 @router.post("/{complaint_id}/update")
 async def update_complaint(
     complaint_id: int,
     update: ComplaintUpdateCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    complaint = await db.get(Complaint, complaint_id)
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
     
@@ -146,10 +289,21 @@ async def update_complaint(
         if update.status == "resolved":
             complaint.resolved_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    invalidate_dashboard()
+    bump_version("complaints")
+    await broker.publish(complaint_event("complaint_updated", complaint))
+    
+    if update.status:
+        # Status is a tile attribute, so tiles showing this complaint are stale
+        lon, lat = (await db.execute(
+            select(func.ST_X(Complaint.location), func.ST_Y(Complaint.location)).filter(Complaint.id == complaint_id)
+        )).one()
+        if lon is not None:
+            invalidate_point("complaints", lon, lat)
+    
     return {"message": "Complaint updated successfully"}
 
-async def auto_assign_worker(complaint_id: int, db: Session):
+async def auto_assign_worker(complaint_id: int, db: AsyncSession):
     """Auto-assign available worker based on category and location"""
-    # Implementation for worker assignment logic
-    pass
+    return await db.run_sync(assign_complaint, complaint_id)
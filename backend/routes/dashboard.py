@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, select
 from pydantic import BaseModel
-from config.database import get_db
+from typing import List, Optional
+from config.database import get_async_db
 from models.complaint import Complaint
-from models.user import User
+from services.auth import CurrentUser, get_current_user
 from models.building import Building
 from models.utility import UtilityConsumption
+from services.dashboard import get_stats
+from services.hotspots import MAX_RESOLUTION, find_hotspots
+from services.spatial import parse_bbox
+from services.versions import conditional_get
 from datetime import datetime, timedelta
 
 router = APIRouter()
@@ -20,67 +25,39 @@ class DashboardStats(BaseModel):
     active_workers: int
     recent_activity: list
 
-async def get_current_user(db: Session = Depends(get_db)):
-    return db.query(User).first()
+class HotspotCell(BaseModel):
+    cell_x: int
+    cell_y: int
+    longitude: float
+    latitude: float
+    cell_meters: float
+    complaints: int
+    density: float
+    score: float
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get complaint statistics
-    total_complaints = db.query(Complaint).count()
-    open_complaints = db.query(Complaint).filter(Complaint.status == 'open').count()
-    resolved_complaints = db.query(Complaint).filter(Complaint.status == 'resolved').count()
-    critical_complaints = db.query(Complaint).filter(Complaint.urgency_level == 'critical').count()
-    
-    # Get building count
-    total_buildings = db.query(Building).count()
-    
-    # Get active workers
-    active_workers = db.query(User).filter(User.role == 'worker').count()
-    
-    # Get recent activity (last 7 days)
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_complaints = db.query(Complaint).filter(
-        Complaint.created_at >= week_ago
-    ).order_by(Complaint.created_at.desc()).limit(5).all()
-    
-    recent_activity = []
-    for complaint in recent_complaints:
-        recent_activity.append({
-            'type': 'complaint',
-            'message': f"New {complaint.category} complaint: {complaint.title}",
-            'timestamp': complaint.created_at.isoformat(),
-            'status': complaint.status
-        })
-    
-    return DashboardStats(
-        total_complaints=total_complaints,
-        open_complaints=open_complaints,
-        resolved_complaints=resolved_complaints,
-        critical_complaints=critical_complaints,
-        total_buildings=total_buildings,
-        active_workers=active_workers,
-        recent_activity=recent_activity
-    )
+    return DashboardStats(**await get_stats(db))
 
-@router.get("/complaint-trends")
+@router.get("/complaint-trends", dependencies=[Depends(conditional_get("complaints", daily=True))])
 async def get_complaint_trends(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Get complaint trends for the last 30 days
     thirty_days_ago = datetime.now() - timedelta(days=30)
     
-    daily_complaints = db.query(
+    daily_complaints = await db.execute(select(
         func.date(Complaint.created_at).label('date'),
         func.count(Complaint.id).label('count')
     ).filter(
         Complaint.created_at >= thirty_days_ago
     ).group_by(
         func.date(Complaint.created_at)
-    ).order_by('date').all()
+    ).order_by('date'))
     
     trends = []
     for date, count in daily_complaints:
@@ -91,15 +68,15 @@ async def get_complaint_trends(
     
     return trends
 
-@router.get("/category-distribution")
+@router.get("/category-distribution", dependencies=[Depends(conditional_get("complaints"))])
 async def get_category_distribution(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    categories = db.query(
+    categories = await db.execute(select(
         Complaint.category,
         func.count(Complaint.id).label('count')
-    ).group_by(Complaint.category).all()
+    ).group_by(Complaint.category))
     
     distribution = []
     for category, count in categories:
@@ -109,3 +86,23 @@ async def get_category_distribution(
         })
     
     return distribution
+
+@router.get("/hotspots", response_model=List[HotspotCell])
+async def get_hotspots(
+    days: int = Query(30, ge=1, le=3650),
+    category: Optional[str] = None,
+    bbox: Optional[str] = None,
+    resolution: int = Query(1, ge=1, le=MAX_RESOLUTION),
+    min_count: int = Query(1, ge=1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Complaint counts and density per grid cell, busiest cells first"""
+    return await db.run_sync(
+        find_hotspots,
+        days=days,
+        category=category,
+        bbox=parse_bbox(bbox) if bbox else None,
+        resolution=resolution,
+        min_count=min_count
+    )
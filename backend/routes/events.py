@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from config.database import AsyncSessionLocal
+from services.auth import resolve_user
+from services.events import broker, visible_to
+import json
+
+router = APIRouter()
+
+# Idle connections get a keep-alive this often so proxies do not close them
+HEARTBEAT_SECONDS = 15
+
+def _bearer_token(request: Request, token: Optional[str]):
+    # EventSource cannot set headers, so the token may also come as a query parameter
+    header = request.headers.get("Authorization", "")
+    if header.lower().startswith("bearer "):
+        return header[7:]
+    if token:
+        return token
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+
+async def _authenticate(token: str):
+    # A short-lived session, so long-lived streams do not pin a pooled connection
+    async with AsyncSessionLocal() as db:
+        return await resolve_user(token, db)
+
+async def _event_stream(request: Request, subscription):
+    try:
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        subscription.close()
+
+@router.get("/stream")
+async def stream_events(request: Request, token: Optional[str] = None):
+    """Server-Sent Events feed of complaint changes visible to the caller"""
+    current_user = await _authenticate(_bearer_token(request, token))
+    subscription = broker.subscribe(visible_to(current_user))
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def events_websocket(websocket: WebSocket, token: str):
+    """WebSocket feed of complaint changes visible to the caller"""
+    try:
+        current_user = await _authenticate(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = broker.subscribe(visible_to(current_user))
+    try:
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            await websocket.send_json(event if event is not None else {"type": "keep_alive"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel
+from typing import Any, Dict
+from services.auth import CurrentUser, get_current_user
+from services.jobs import JobStatus, check_job_access, job_location, job_queue, submit_job
+
+router = APIRouter()
+
+class JobSubmission(BaseModel):
+    type: str
+    params: Dict[str, Any] = {}
+
+async def _get_job(job_id: str, current_user: CurrentUser):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    check_job_access(job["type"], current_user)
+    return job
+
+@router.post("", response_model=JobStatus, status_code=202)
+async def create_job(
+    submission: JobSubmission,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Queue a forecast, batch forecast, prioritizer retraining, rescoring or backlog assignment job.
+
+    Submitting a job identical to one still queued or running returns that job.
+    """
+    job = await submit_job(submission.type, submission.params, current_user)
+    response.headers.update(job_location(job))
+    return job
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await _get_job(job_id, current_user)
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    job = await _get_job(job_id, current_user)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job['error']}")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return {"id": job["id"], "type": job["type"], "result": await job_queue.result(job_id)}
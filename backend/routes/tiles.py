@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.database import get_async_db
+from services.auth import CurrentUser, get_current_user
+from services.tiles import LAYERS, MAX_ZOOM, build_tile
+
+router = APIRouter()
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if layer not in LAYERS:
+        raise HTTPException(status_code=404, detail="Unknown tile layer")
+    if not 0 <= z <= MAX_ZOOM or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range")
+    
+    tile = await build_tile(db, layer, z, x, y)
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile")
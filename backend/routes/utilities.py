@@ -1,15 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime, date
-from config.database import get_db
+from typing import List, Optional, Union
+from datetime import date
+from config.database import get_db, get_async_db, SessionLocal
 from models.utility import UtilityConsumption
 from models.building import Building
-from models.user import User
-import pandas as pd
-from prophet import Prophet
+from models.rollup import ConsumptionRollup
+from services.auth import CurrentUser, get_current_user
+from services.forecasting import DEFAULT_FORECAST_MODEL, FORECAST_MODELS, cached_forecast, forecast_cache, peek_forecast
+from services.batch_forecast import precomputed_forecast
+from services.analytics import BUCKETS, consumption_summary, consumption_buckets
+from services.rollups import GRANULARITIES, refresh_rollups_for_reading
+from services.serialization import check_format, list_response
+from services.export import EXPORT_FORMATS, MEDIA_TYPES, consumption_schema, consumption_query, export_response_body
+from services.jobs import JOB_WAIT_SECONDS, JobStatus, job_location, job_queue, submit_job
+from services.job_tasks import BatchForecastParams
+from services.serialization import TimedORJSONResponse
 
 router = APIRouter()
 
@@ -29,142 +41,241 @@ class UtilityConsumptionResponse(BaseModel):
     recorded_date: date
     building_name: str
 
+class ConsumptionRollupResponse(BaseModel):
+    building_id: int
+    utility_type: str
+    granularity: str
+    period_start: date
+    total_consumption: float
+    average_consumption: float
+    min_consumption: float
+    max_consumption: float
+    readings: int
+    building_name: str
+
 class ConsumptionPrediction(BaseModel):
     date: str
     predicted_value: float
     lower_bound: float
     upper_bound: float
 
-async def get_current_user(db: Session = Depends(get_db)):
-    return db.query(User).first()
-
 @router.post("/consumption/create")
 async def create_consumption(
     consumption: UtilityConsumptionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_consumption = UtilityConsumption(**consumption.dict())
     db.add(db_consumption)
-    db.commit()
-    db.refresh(db_consumption)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="A reading for this building, utility and date already exists")
+    await db.run_sync(
+        refresh_rollups_for_reading, consumption.building_id, consumption.utility_type, consumption.recorded_date
+    )
+    await db.commit()
+    await db.refresh(db_consumption)
     
     return {"message": "Consumption data added successfully", "id": db_consumption.id}
 
-@router.get("/consumption/list", response_model=List[UtilityConsumptionResponse])
+@router.post("/consumption/bulk")
+async def bulk_ingest_consumption(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    # COPY goes through psycopg2, so ingestion keeps the synchronous engine
+    db: Session = Depends(get_db)
+):
+    """Bulk load readings from a CSV or NDJSON upload"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    # Validation runs on pandas, which is only imported once an upload arrives
+    from services.ingest import ingest_readings
+    
+    file_format = format or ("ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv")
+    try:
+        # COPY and validation are blocking; keep them off the event loop
+        return await run_in_threadpool(ingest_readings, db, file.file, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get(
+    "/consumption/list",
+    response_model=Union[List[UtilityConsumptionResponse], List[ConsumptionRollupResponse]]
+)
 async def get_consumption_data(
     building_id: Optional[int] = None,
     utility_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    granularity: Optional[str] = None,
+    format: str = "rows",
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(UtilityConsumption, Building.name.label('building_name')).join(Building)
+    check_format(format)
+    if granularity:
+        if granularity not in GRANULARITIES:
+            raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        return await _list_rollups(db, building_id, utility_type, granularity, format)
+    
+    query = select(
+        UtilityConsumption.id,
+        UtilityConsumption.building_id,
+        UtilityConsumption.utility_type,
+        UtilityConsumption.consumption_value,
+        UtilityConsumption.unit,
+        UtilityConsumption.recorded_date,
+        Building.name.label('building_name')
+    ).join(Building)
     
     if building_id:
         query = query.filter(UtilityConsumption.building_id == building_id)
     if utility_type:
         query = query.filter(UtilityConsumption.utility_type == utility_type)
     
-    results = query.all()
+    results = await db.execute(query)
+    return list_response(results.keys(), results.all(), format)
+
+async def _list_rollups(db, building_id, utility_type, granularity, format):
+    query = select(
+        ConsumptionRollup.building_id,
+        ConsumptionRollup.utility_type,
+        ConsumptionRollup.granularity,
+        ConsumptionRollup.period_start,
+        ConsumptionRollup.total.label('total_consumption'),
+        (ConsumptionRollup.total / ConsumptionRollup.reading_count).label('average_consumption'),
+        ConsumptionRollup.min_value.label('min_consumption'),
+        ConsumptionRollup.max_value.label('max_consumption'),
+        ConsumptionRollup.reading_count.label('readings'),
+        Building.name.label('building_name')
+    ).join(
+        Building, ConsumptionRollup.building_id == Building.id
+    ).filter(ConsumptionRollup.granularity == granularity)
+    
+    if building_id:
+        query = query.filter(ConsumptionRollup.building_id == building_id)
+    if utility_type:
+        query = query.filter(ConsumptionRollup.utility_type == utility_type)
     
-    consumption_data = []
-    for consumption, building_name in results:
-        consumption_data.append(UtilityConsumptionResponse(
-            id=consumption.id,
-            building_id=consumption.building_id,
-            utility_type=consumption.utility_type,
-            consumption_value=consumption.consumption_value,
-            unit=consumption.unit,
-            recorded_date=consumption.recorded_date,
-            building_name=building_name
-        ))
+    results = await db.execute(query.order_by(ConsumptionRollup.period_start))
+    return list_response(results.keys(), results.all(), format)
+
+@router.get("/consumption/export")
+async def export_consumption(
+    format: str = "arrow",
+    building_id: Optional[List[int]] = Query(None),
+    utility_type: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream readings as an Arrow IPC stream or Parquet file in constant memory"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
     
-    return consumption_data
+    query = consumption_query(building_id, utility_type, start_date, end_date)
+    return StreamingResponse(
+        export_response_body(query, consumption_schema(), format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="consumption.{format}"'}
+    )
 
 @router.get("/consumption/predict/{building_id}/{utility_type}")
 async def predict_consumption(
     building_id: int,
     utility_type: str,
     days: int = 30,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    model: str = DEFAULT_FORECAST_MODEL,
+    granularity: str = "day",
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get historical data
-    consumption_data = db.query(UtilityConsumption).filter(
-        and_(
-            UtilityConsumption.building_id == building_id,
-            UtilityConsumption.utility_type == utility_type
-        )
-    ).order_by(UtilityConsumption.recorded_date).all()
+    if model not in FORECAST_MODELS:
+        raise HTTPException(status_code=400, detail=f"model must be one of: {', '.join(FORECAST_MODELS)}")
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
     
-    if len(consumption_data) < 10:
+    # Serve the nightly batch output when it is current, fit on demand otherwise
+    predictions = None
+    if granularity == "day":
+        predictions = await db.run_sync(precomputed_forecast, building_id, utility_type, days, model)
+    if predictions is None and model == "prophet":
+        # Answer from this process's forecast cache before involving the job pool
+        key, predictions = await db.run_sync(peek_forecast, building_id, utility_type, days, model, granularity)
+        if key is None:
+            raise HTTPException(status_code=400, detail="Insufficient data for prediction")
+        if predictions is None:
+            # Prophet fits take seconds to minutes, so they run in the job pool, where
+            # identical requests share one fit; a slow fit answers with its job instead
+            job = await submit_job("forecast", {
+                "building_id": building_id, "utility_type": utility_type,
+                "days": days, "model": model, "granularity": granularity
+            }, current_user)
+            job = await job_queue.wait(job["id"], JOB_WAIT_SECONDS)
+            if job["status"] == "failed":
+                raise HTTPException(status_code=500, detail=f"Forecast failed: {job['error']}")
+            if job["status"] != "succeeded":
+                return TimedORJSONResponse(JobStatus(**job).dict(), status_code=202, headers=job_location(job))
+            predictions = await job_queue.result(job["id"])
+            if predictions is not None:
+                # The fit ran in another process; keep it in this one's cache too
+                forecast_cache.set(key, predictions)
+    elif predictions is None:
+        # The fast models are vectorized numpy; fit them on a worker thread with its own session
+        predictions = await run_in_threadpool(
+            _cached_forecast_task, building_id, utility_type, days, model, granularity
+        )
+    if predictions is None:
         raise HTTPException(status_code=400, detail="Insufficient data for prediction")
     
-    # Prepare data for Prophet
-    df = pd.DataFrame([
-        {
-            'ds': item.recorded_date,
-            'y': item.consumption_value
-        }
-        for item in consumption_data
-    ])
-    
-    # Create and fit Prophet model
-    model = Prophet(daily_seasonality=True, yearly_seasonality=True)
-    model.fit(df)
-    
-    # Make future predictions
-    future = model.make_future_dataframe(periods=days)
-    forecast = model.predict(future)
-    
-    # Get only future predictions
-    future_predictions = forecast.tail(days)
-    
-    predictions = []
-    for _, row in future_predictions.iterrows():
-        predictions.append(ConsumptionPrediction(
-            date=row['ds'].strftime('%Y-%m-%d'),
-            predicted_value=row['yhat'],
-            lower_bound=row['yhat_lower'],
-            upper_bound=row['yhat_upper']
-        ))
+    return [ConsumptionPrediction(**prediction) for prediction in predictions]
+
+def _cached_forecast_task(building_id, utility_type, days, model, granularity):
+    db = SessionLocal()
+    try:
+        return cached_forecast(db, building_id, utility_type, days, model, granularity)
+    finally:
+        db.close()
+
+@router.post("/consumption/forecast/batch", status_code=202)
+async def batch_forecast(
+    request: BatchForecastParams,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if request.model not in FORECAST_MODELS:
+        raise HTTPException(status_code=400, detail=f"model must be one of: {', '.join(FORECAST_MODELS)}")
     
-    return predictions
+    job = await submit_job("batch_forecast", request.dict(), current_user)
+    return TimedORJSONResponse(
+        {"message": "Batch forecast queued", "job": JobStatus(**job).dict()},
+        status_code=202,
+        headers=job_location(job)
+    )
 
 @router.get("/consumption/analytics/{building_id}")
 async def get_consumption_analytics(
     building_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Get consumption data for all utility types
-    consumption_data = db.query(UtilityConsumption).filter(
-        UtilityConsumption.building_id == building_id
-    ).all()
+    if bucket and bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(BUCKETS)}")
     
-    if not consumption_data:
+    analytics = await db.run_sync(consumption_summary, building_id, start_date, end_date)
+    if not analytics:
         raise HTTPException(status_code=404, detail="No consumption data found")
     
-    # Calculate analytics
-    df = pd.DataFrame([
-        {
-            'utility_type': item.utility_type,
-            'consumption_value': item.consumption_value,
-            'recorded_date': item.recorded_date
-        }
-        for item in consumption_data
-    ])
-    
-    analytics = {}
-    for utility_type in df['utility_type'].unique():
-        utility_data = df[df['utility_type'] == utility_type]
-        
-        analytics[utility_type] = {
-            'total_consumption': utility_data['consumption_value'].sum(),
-            'average_consumption': utility_data['consumption_value'].mean(),
-            'max_consumption': utility_data['consumption_value'].max(),
-            'min_consumption': utility_data['consumption_value'].min(),
-            'trend': 'increasing' if utility_data['consumption_value'].iloc[-1] > utility_data['consumption_value'].iloc[0] else 'decreasing'
-        }
+    if bucket:
+        buckets = await db.run_sync(consumption_buckets, building_id, bucket, start_date, end_date)
+        for utility_type, series in buckets.items():
+            analytics[utility_type]['buckets'] = series
     
     return analytics
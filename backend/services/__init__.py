@@ -0,0 +1 @@
+# This file makes services a package
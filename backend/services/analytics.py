@@ -0,0 +1,161 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import array_agg, aggregate_order_by
+from models.utility import UtilityConsumption
+from models.rollup import ConsumptionRollup
+from services.rollups import GRANULARITIES, coarsest_granularity
+
+BUCKETS = GRANULARITIES
+
+def _filtered(query, building_id, start_date=None, end_date=None):
+    query = query.filter(UtilityConsumption.building_id == building_id)
+    if start_date:
+        query = query.filter(UtilityConsumption.recorded_date >= start_date)
+    if end_date:
+        query = query.filter(UtilityConsumption.recorded_date <= end_date)
+    return query
+
+def _raw_summary(db, building_id: int, start_date=None, end_date=None):
+    """Summarise each utility type of a building in a single GROUP BY over raw readings"""
+    value = UtilityConsumption.consumption_value
+    recorded_date = UtilityConsumption.recorded_date
+    # Days since the epoch, so the slope is in units per day
+    day_number = func.extract('epoch', recorded_date) / 86400
+    
+    rows = _filtered(db.query(
+        UtilityConsumption.utility_type,
+        func.sum(value).label('total'),
+        func.avg(value).label('average'),
+        func.max(value).label('maximum'),
+        func.min(value).label('minimum'),
+        array_agg(aggregate_order_by(value, recorded_date.asc()))[1].label('first_value'),
+        array_agg(aggregate_order_by(value, recorded_date.desc()))[1].label('last_value'),
+        func.regr_slope(value, day_number).label('slope'),
+        func.count(UtilityConsumption.id).label('readings')
+    ), building_id, start_date, end_date).group_by(UtilityConsumption.utility_type).all()
+    
+    return _summaries(rows)
+
+def _summaries(rows):
+    return {
+        row.utility_type: {
+            'total_consumption': row.total,
+            'average_consumption': row.average,
+            'max_consumption': row.maximum,
+            'min_consumption': row.minimum,
+            'first_value': row.first_value,
+            'last_value': row.last_value,
+            'slope_per_day': row.slope or 0.0,
+            'readings': row.readings,
+            'trend': 'increasing' if row.last_value > row.first_value else 'decreasing'
+        }
+        for row in rows
+    }
+
+def _raw_buckets(db, building_id: int, bucket: str, start_date=None, end_date=None):
+    """Per utility type totals and averages for each day, week or month from raw readings"""
+    period = func.date_trunc(bucket, UtilityConsumption.recorded_date).label('period')
+    rows = _filtered(db.query(
+        UtilityConsumption.utility_type,
+        period,
+        func.sum(UtilityConsumption.consumption_value).label('total'),
+        func.avg(UtilityConsumption.consumption_value).label('average')
+    ), building_id, start_date, end_date).group_by(
+        UtilityConsumption.utility_type, period
+    ).order_by(UtilityConsumption.utility_type, period).all()
+    
+    return _bucket_series(rows)
+
+def _bucket_series(rows):
+    buckets = {}
+    for row in rows:
+        buckets.setdefault(row.utility_type, []).append({
+            'period': row.period.strftime('%Y-%m-%d'),
+            'total_consumption': row.total,
+            'average_consumption': row.average
+        })
+    return buckets
+
+def _rollup_query(db, columns, building_id, granularity, start_date=None, end_date=None):
+    query = db.query(*columns).filter(
+        ConsumptionRollup.building_id == building_id,
+        ConsumptionRollup.granularity == granularity
+    )
+    # The granularity is chosen so that these bounds fall on period boundaries
+    if start_date:
+        query = query.filter(ConsumptionRollup.period_start >= start_date)
+    if end_date:
+        query = query.filter(ConsumptionRollup.period_start <= end_date)
+    return query
+
+def _rollup_summary(db, building_id: int, start_date=None, end_date=None):
+    """Merge rollup rows of the coarsest fitting granularity into per utility summaries"""
+    R = ConsumptionRollup
+    n = func.sum(R.reading_count)
+    sum_x = func.sum(R.sum_x)
+    sum_y = func.sum(R.total)
+    granularity = coarsest_granularity(start_date, end_date)
+    
+    rows = _rollup_query(db, (
+        R.utility_type,
+        sum_y.label('total'),
+        (sum_y / n).label('average'),
+        func.max(R.max_value).label('maximum'),
+        func.min(R.min_value).label('minimum'),
+        array_agg(aggregate_order_by(R.first_value, R.first_date.asc()))[1].label('first_value'),
+        array_agg(aggregate_order_by(R.last_value, R.last_date.desc()))[1].label('last_value'),
+        # Least-squares slope from the merged sums
+        ((n * func.sum(R.sum_xy) - sum_x * sum_y) / func.nullif(n * func.sum(R.sum_xx) - sum_x * sum_x, 0)).label('slope'),
+        n.label('readings')
+    ), building_id, granularity, start_date, end_date).group_by(R.utility_type).all()
+    return _summaries(rows)
+
+def _raw_counts(db, building_id: int, start_date=None, end_date=None):
+    """Readings per utility type, an index-only count used to check rollup coverage"""
+    return dict(_filtered(db.query(
+        UtilityConsumption.utility_type,
+        func.count(UtilityConsumption.id)
+    ), building_id, start_date, end_date).group_by(UtilityConsumption.utility_type).all())
+
+def _rollups_complete(db, building_id: int, rollup_counts: dict, start_date=None, end_date=None):
+    """True when the rollups cover exactly the readings in range.
+
+    Rollups are refreshed as readings arrive, so a database that predates them
+    only has periods for new readings until 'python cli.py rollups' runs; any
+    gap shows up as a count mismatch.
+    """
+    return bool(rollup_counts) and rollup_counts == _raw_counts(db, building_id, start_date, end_date)
+
+def _rollup_buckets(db, building_id: int, bucket: str, start_date=None, end_date=None):
+    """Bucketed totals from the bucket's own rollup, or from daily rollups when the range is not aligned"""
+    R = ConsumptionRollup
+    allowed = tuple(g for g in GRANULARITIES if g in ("day", bucket))
+    granularity = coarsest_granularity(start_date, end_date, allowed)
+    period = func.date_trunc(bucket, R.period_start).label('period')
+    
+    rows = _rollup_query(db, (
+        R.utility_type,
+        period,
+        func.sum(R.total).label('total'),
+        (func.sum(R.total) / func.sum(R.reading_count)).label('average'),
+        func.sum(R.reading_count).label('readings')
+    ), building_id, granularity, start_date, end_date).group_by(
+        R.utility_type, period
+    ).order_by(R.utility_type, period).all()
+    counts = {}
+    for row in rows:
+        counts[row.utility_type] = counts.get(row.utility_type, 0) + row.readings
+    return _bucket_series(rows), counts
+
+def consumption_summary(db, building_id: int, start_date=None, end_date=None):
+    """Summarise each utility type of a building, reading rollups when they cover the range"""
+    summary = _rollup_summary(db, building_id, start_date, end_date)
+    counts = {utility_type: stats['readings'] for utility_type, stats in summary.items()}
+    if _rollups_complete(db, building_id, counts, start_date, end_date):
+        return summary
+    return _raw_summary(db, building_id, start_date, end_date)
+
+def consumption_buckets(db, building_id: int, bucket: str, start_date=None, end_date=None):
+    buckets, counts = _rollup_buckets(db, building_id, bucket, start_date, end_date)
+    if _rollups_complete(db, building_id, counts, start_date, end_date):
+        return buckets
+    return _raw_buckets(db, building_id, bucket, start_date, end_date)
@@ -0,0 +1,169 @@
+import numpy as np
+from sqlalchemy import text
+
+# Nearest skilled workers considered when assigning a single complaint
+KNN_CANDIDATES = 20
+# Choices retried when the chosen worker fills up before the assignment lands
+ASSIGN_ATTEMPTS = 3
+# Upper bound on complaints taken from the backlog in one batch run
+BACKLOG_LIMIT = 50000
+MAX_BACKLOG_LIMIT = 200000
+EARTH_RADIUS_KM = 6371.0
+
+# Complaints in progress count against a worker's max_open_complaints
+_WORKLOAD = """
+    SELECT assigned_worker_id AS user_id, count(*) AS open_count
+    FROM complaints
+    WHERE status IN ('assigned', 'in_progress') AND assigned_worker_id IS NOT NULL
+    GROUP BY assigned_worker_id
+"""
+
+# One worker's share of _WORKLOAD
+_OPEN_COUNT = """
+    SELECT count(*) FROM complaints
+    WHERE assigned_worker_id = {worker} AND status IN ('assigned', 'in_progress')
+"""
+
+# Walks the worker location index outwards, skipping full workers before the
+# candidate limit so free workers further away are still found, then picks the
+# cheapest by distance weighted by how full their queue is
+_CHOOSE_ONE = text(f"""
+    WITH target AS (
+        SELECT id, category, location FROM complaints
+        WHERE id = :complaint_id AND assigned_worker_id IS NULL AND status = 'open' AND location IS NOT NULL
+        FOR UPDATE SKIP LOCKED
+    ),
+    candidates AS (
+        SELECT w.user_id, w.max_open_complaints, load.open_count,
+               ST_Distance(geography(w.location), geography(t.location)) AS distance
+        FROM worker_profiles w
+        CROSS JOIN target t
+        CROSS JOIN LATERAL ({_OPEN_COUNT.format(worker="w.user_id")}) AS load(open_count)
+        WHERE w.active AND w.location IS NOT NULL AND t.category = ANY(w.skills)
+          AND load.open_count < w.max_open_complaints
+        ORDER BY w.location <-> t.location
+        LIMIT :candidates
+    )
+    SELECT user_id FROM candidates
+    ORDER BY distance * (1 + open_count::float8 / max_open_complaints)
+    LIMIT 1
+""")
+
+# Concurrent assignments to the same worker queue up here
+_LOCK_WORKER = text("SELECT 1 FROM worker_profiles WHERE user_id = :worker_id FOR UPDATE")
+
+# Runs after the worker lock is held, so its fresh snapshot sees every
+# assignment committed to that worker before this one
+_APPLY_ONE = text(f"""
+    UPDATE complaints SET assigned_worker_id = :worker_id, status = 'assigned', updated_at = now()
+    WHERE id = :complaint_id AND assigned_worker_id IS NULL AND status = 'open'
+      AND ({_OPEN_COUNT.format(worker=":worker_id")})
+          < (SELECT max_open_complaints FROM worker_profiles WHERE user_id = :worker_id)
+    RETURNING assigned_worker_id
+""")
+
+_WORKERS = text(f"""
+    SELECT w.user_id, w.skills, ST_X(w.location) AS lon, ST_Y(w.location) AS lat,
+           w.max_open_complaints, coalesce(load.open_count, 0) AS open_count
+    FROM worker_profiles w
+    LEFT JOIN ({_WORKLOAD}) AS load ON load.user_id = w.user_id
+    WHERE w.active AND w.location IS NOT NULL
+""")
+
+# Taken before _WORKERS reads the loads, in id order so concurrent runs cannot deadlock
+_LOCK_WORKERS = text("SELECT user_id FROM worker_profiles WHERE active ORDER BY user_id FOR UPDATE")
+
+_BACKLOG = text("""
+    SELECT id, category, ST_X(location) AS lon, ST_Y(location) AS lat
+    FROM complaints
+    WHERE assigned_worker_id IS NULL AND status = 'open' AND location IS NOT NULL
+    ORDER BY priority_score DESC, created_at, id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+""")
+
+_APPLY = text("""
+    UPDATE complaints SET assigned_worker_id = a.worker_id, status = 'assigned', updated_at = now()
+    FROM unnest(CAST(:complaint_ids AS integer[]), CAST(:worker_ids AS integer[])) AS a(complaint_id, worker_id)
+    WHERE complaints.id = a.complaint_id AND complaints.assigned_worker_id IS NULL AND complaints.status = 'open'
+""")
+
+def assign_complaint(db, complaint_id: int, candidates: int = KNN_CANDIDATES):
+    """Assign one open complaint to the best nearby skilled worker with spare capacity.
+
+    Returns the chosen worker id, or None if nobody qualifies.
+    """
+    params = {"complaint_id": complaint_id, "candidates": candidates}
+    for _ in range(ASSIGN_ATTEMPTS):
+        worker_id = db.execute(_CHOOSE_ONE, params).scalar()
+        if worker_id is None:
+            break
+        db.execute(_LOCK_WORKER, {"worker_id": worker_id})
+        assigned = db.execute(_APPLY_ONE, {**params, "worker_id": worker_id}).scalar()
+        if assigned is not None:
+            db.commit()
+            return assigned
+        # A concurrent assignment filled the worker up; choose again from fresh counts
+    db.commit()
+    return None
+
+def _haversine_km(lon, lat, lons, lats):
+    lon, lat, lons, lats = map(np.radians, (lon, lat, lons, lats))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def plan_assignments(complaints, workers):
+    """Greedily match complaints, highest priority first, to workers.
+
+    `complaints` rows are (id, category, lon, lat) in priority order and
+    `workers` rows are (user_id, skills, lon, lat, max_open, open_count).
+    Each complaint goes to the skilled worker with spare capacity that
+    minimises distance * (1 + load / capacity), so nearby workers are
+    preferred but full queues spread work to the next closest.
+    Returns a list of (complaint_id, worker_id).
+    """
+    if not complaints or not workers:
+        return []
+
+    worker_ids = np.array([w[0] for w in workers])
+    worker_lon = np.array([w[2] for w in workers], dtype=float)
+    worker_lat = np.array([w[3] for w in workers], dtype=float)
+    capacity = np.array([w[4] for w in workers], dtype=float)
+    load = np.array([w[5] for w in workers], dtype=float)
+    skilled = {}
+    for i, worker in enumerate(workers):
+        for category in worker[1] or ():
+            skilled.setdefault(category, []).append(i)
+    skilled = {category: np.array(idx) for category, idx in skilled.items()}
+
+    plan = []
+    for complaint_id, category, lon, lat in complaints:
+        idx = skilled.get(category)
+        if idx is None:
+            continue
+        idx = idx[load[idx] < capacity[idx]]
+        if not len(idx):
+            continue
+        distance = _haversine_km(lon, lat, worker_lon[idx], worker_lat[idx])
+        best = idx[np.argmin(distance * (1 + load[idx] / capacity[idx]))]
+        load[best] += 1
+        plan.append((complaint_id, int(worker_ids[best])))
+    return plan
+
+def assign_backlog(db, limit: int = BACKLOG_LIMIT):
+    """Assign every unassigned open complaint in one pass and one transaction.
+
+    Reads the backlog and the worker pool once, plans in memory and writes
+    all assignments with a single UPDATE. Worker rows stay locked until then,
+    so single assignments wait instead of overfilling a planned queue.
+    """
+    complaints = [tuple(row) for row in db.execute(_BACKLOG, {"limit": limit})]
+    db.execute(_LOCK_WORKERS)
+    workers = [tuple(row) for row in db.execute(_WORKERS)]
+    plan = plan_assignments(complaints, workers)
+
+    if plan:
+        complaint_ids, worker_ids = zip(*plan)
+        db.execute(_APPLY, {"complaint_ids": list(complaint_ids), "worker_ids": list(worker_ids)})
+    db.commit()
+    return {"considered": len(complaints), "assigned": len(plan), "unassigned": len(complaints) - len(plan)}
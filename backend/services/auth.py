@@ -0,0 +1,57 @@
+import os
+from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.auth import verify_token
+from config.database import get_async_db
+from models.user import User
+from services.cache import make_ttl_cache
+
+# Code that changes a user calls invalidate_user; the TTL bounds how long edits
+# made directly in the database keep serving the old role
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+
+user_cache = make_ttl_cache("auth:users", USER_CACHE_TTL)
+security = HTTPBearer()
+
+class CurrentUser(BaseModel):
+    """Detached snapshot of the authenticated user, safe to share between requests"""
+    id: int
+    email: str
+    role: str
+    first_name: str
+    last_name: str
+    building_id: Optional[int] = None
+
+async def resolve_user(token: str, db: AsyncSession) -> CurrentUser:
+    """Resolve a bearer token to its user, from the cache when possible"""
+    email = verify_token(token)
+    principal = user_cache.get(email)
+    if principal is not None:
+        return principal
+    
+    row = (await db.execute(
+        select(User.id, User.email, User.role, User.first_name, User.last_name, User.building_id)
+        .filter(User.email == email)
+    )).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    principal = CurrentUser(**row._mapping)
+    user_cache.set(email, principal)
+    return principal
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    return await resolve_user(credentials.credentials, db)
+
+def invalidate_user(email):
+    """Drop a cached principal; call after any change to the user's row"""
+    user_cache.delete(email)
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import delete, insert
+from models.forecast import ConsumptionForecast
+from models.utility import UtilityConsumption
+from services.forecasting import DEFAULT_FORECAST_MODEL, MIN_HISTORY, fit_forecast, series_version
+from ml.forecaster import forecast_many
+
+# Each worker receives several chunks so that uneven Prophet fits balance out
+CHUNKS_PER_WORKER = 4
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def load_all_series(db, building_ids=None, utility_types=None):
+    """Load every consumption series in one ordered query.
+
+    Returns {(building_id, utility_type): (history, version)} for series long
+    enough to forecast, where version matches services.forecasting.series_version.
+    """
+    import pandas as pd
+    
+    query = db.query(
+        UtilityConsumption.building_id,
+        UtilityConsumption.utility_type,
+        UtilityConsumption.recorded_date,
+        UtilityConsumption.consumption_value,
+        UtilityConsumption.updated_at
+    )
+    if building_ids:
+        query = query.filter(UtilityConsumption.building_id.in_(building_ids))
+    if utility_types:
+        query = query.filter(UtilityConsumption.utility_type.in_(utility_types))
+    query = query.order_by(
+        UtilityConsumption.building_id,
+        UtilityConsumption.utility_type,
+        UtilityConsumption.recorded_date
+    )
+    
+    df = pd.DataFrame(query.all(), columns=['building_id', 'utility_type', 'ds', 'y', 'updated_at'])
+    series = {}
+    for key, group in df.groupby(['building_id', 'utility_type'], sort=False):
+        if len(group) >= MIN_HISTORY:
+            history = group[['ds', 'y']].reset_index(drop=True)
+            series[key] = (history, (history['ds'].iloc[-1], len(history), group['updated_at'].max().to_pydatetime()))
+    return series
+
+def _forecast_chunk(keys, histories, days, model):
+    """Process pool entry point; must stay a picklable module-level function"""
+    if model == "prophet":
+        predictions = [fit_forecast(history, days, model) for history in histories]
+    else:
+        predictions = forecast_many(histories, days, model)
+    return list(zip(keys, predictions))
+
+def _chunks(items, count):
+    size = max(1, -(-len(items) // count))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def run_batch_forecast(db, days=30, model=DEFAULT_FORECAST_MODEL, workers=None, building_ids=None, utility_types=None):
+    """Forecast every series across a process pool and store the results.
+
+    Returns a summary with the number of series and forecast rows written.
+    """
+    series = load_all_series(db, building_ids, utility_types)
+    if not series:
+        return {"series": 0, "rows": 0}
+    
+    workers = workers or available_cores()
+    keys = list(series)
+    jobs = list(_chunks(keys, workers * CHUNKS_PER_WORKER))
+    
+    # spawn avoids forking a process that holds database connections and threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+        futures = [
+            pool.submit(_forecast_chunk, chunk, [series[key][0] for key in chunk], days, model)
+            for chunk in jobs
+        ]
+        results = [item for future in futures for item in future.result()]
+    
+    rows = []
+    for (building_id, utility_type), predictions in results:
+        _, (history_end, history_rows, history_updated_at) = series[(building_id, utility_type)]
+        for prediction in predictions:
+            rows.append({
+                'building_id': building_id,
+                'utility_type': utility_type,
+                'model': model,
+                'forecast_date': date.fromisoformat(prediction['date']),
+                'predicted_value': prediction['predicted_value'],
+                'lower_bound': prediction['lower_bound'],
+                'upper_bound': prediction['upper_bound'],
+                'history_end': history_end,
+                'history_rows': history_rows,
+                'history_updated_at': history_updated_at
+            })
+    
+    replaced = delete(ConsumptionForecast).where(ConsumptionForecast.model == model)
+    if building_ids:
+        replaced = replaced.where(ConsumptionForecast.building_id.in_(building_ids))
+    if utility_types:
+        replaced = replaced.where(ConsumptionForecast.utility_type.in_(utility_types))
+    db.execute(replaced)
+    db.execute(insert(ConsumptionForecast), rows)
+    db.commit()
+    
+    return {"series": len(results), "rows": len(rows)}
+
+def precomputed_forecast(db, building_id: int, utility_type: str, days: int, model: str):
+    """Return stored forecasts if they were fitted on the series' current readings"""
+    latest_date, row_count, updated_at = series_version(db, building_id, utility_type)
+    rows = db.query(ConsumptionForecast).filter(
+        ConsumptionForecast.building_id == building_id,
+        ConsumptionForecast.utility_type == utility_type,
+        ConsumptionForecast.model == model,
+        ConsumptionForecast.history_end == latest_date,
+        ConsumptionForecast.history_rows == row_count,
+        ConsumptionForecast.history_updated_at == updated_at
+    ).order_by(ConsumptionForecast.forecast_date).limit(days).all()
+    
+    if len(rows) < days:
+        return None
+    return [
+        {
+            'date': row.forecast_date.strftime('%Y-%m-%d'),
+            'predicted_value': row.predicted_value,
+            'lower_bound': row.lower_bound,
+            'upper_bound': row.upper_bound
+        }
+        for row in rows
+    ]
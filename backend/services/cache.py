@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with an optional on-disk second tier"""
+    
+    def __init__(self, max_entries=1024, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        
+        if not self.cache_dir:
+            return default
+        try:
+            with open(self._path(key), "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return default
+        self._remember(key, value)
+        return value
+    
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.cache_dir:
+            # Write then rename so readers never see a partial file
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.cache_dir:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, name))
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class TTLCache:
+    """Thread-safe in-process cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, ttl=30, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisCache:
+    """TTL cache shared between processes through Redis, keyed under a namespace"""
+    
+    def __init__(self, namespace, ttl=30, url=None):
+        import redis
+        
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self._errors = redis.RedisError
+    
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+    
+    def get(self, key, default=None):
+        try:
+            raw = self._client.get(self._key(key))
+        except self._errors:
+            logger.warning("Redis cache read failed for %s", self._key(key), exc_info=True)
+            return default
+        return default if raw is None else pickle.loads(raw)
+    
+    def set(self, key, value, ttl=None):
+        try:
+            self._client.set(self._key(key), pickle.dumps(value), ex=self.ttl if ttl is None else ttl)
+        except self._errors:
+            logger.warning("Redis cache write failed for %s", self._key(key), exc_info=True)
+    
+    def delete(self, key):
+        try:
+            self._client.delete(self._key(key))
+        except self._errors:
+            logger.warning("Redis cache delete failed for %s", self._key(key), exc_info=True)
+    
+    def clear(self):
+        try:
+            keys = list(self._client.scan_iter(f"{self.namespace}:*"))
+            if keys:
+                self._client.delete(*keys)
+        except self._errors:
+            logger.warning("Redis cache clear failed for %s", self.namespace, exc_info=True)
+
+def make_ttl_cache(namespace, ttl):
+    """Build a TTL cache on the backend selected by CACHE_BACKEND (memory or redis)"""
+    if os.getenv("CACHE_BACKEND", "memory") == "redis":
+        return RedisCache(namespace, ttl)
+    return TTLCache(ttl)
@@ -0,0 +1,65 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models.complaint import Complaint
+from models.user import User
+from models.building import Building
+from services.cache import make_ttl_cache
+
+dashboard_cache = make_ttl_cache("dashboard", int(os.getenv("DASHBOARD_CACHE_TTL", "15")))
+
+def compute_stats(db):
+    """Collect all dashboard counters in one aggregate query plus the recent activity feed"""
+    (
+        total_complaints,
+        open_complaints,
+        resolved_complaints,
+        critical_complaints,
+        total_buildings,
+        active_workers
+    ) = db.query(
+        func.count(Complaint.id),
+        func.count(Complaint.id).filter(Complaint.status == 'open'),
+        func.count(Complaint.id).filter(Complaint.status == 'resolved'),
+        func.count(Complaint.id).filter(Complaint.urgency_level == 'critical'),
+        db.query(func.count(Building.id)).scalar_subquery(),
+        db.query(func.count(User.id)).filter(User.role == 'worker').scalar_subquery()
+    ).select_from(Complaint).one()
+    
+    # Get recent activity (last 7 days)
+    week_ago = datetime.now() - timedelta(days=7)
+    recent_complaints = db.query(
+        Complaint.category, Complaint.title, Complaint.status, Complaint.created_at
+    ).filter(
+        Complaint.created_at >= week_ago
+    ).order_by(Complaint.created_at.desc()).limit(5).all()
+    
+    recent_activity = []
+    for complaint in recent_complaints:
+        recent_activity.append({
+            'type': 'complaint',
+            'message': f"New {complaint.category} complaint: {complaint.title}",
+            'timestamp': complaint.created_at.isoformat(),
+            'status': complaint.status
+        })
+    
+    return {
+        'total_complaints': total_complaints,
+        'open_complaints': open_complaints,
+        'resolved_complaints': resolved_complaints,
+        'critical_complaints': critical_complaints,
+        'total_buildings': total_buildings,
+        'active_workers': active_workers,
+        'recent_activity': recent_activity
+    }
+
+async def get_stats(db):
+    stats = dashboard_cache.get("stats")
+    if stats is None:
+        stats = await db.run_sync(compute_stats)
+        dashboard_cache.set("stats", stats)
+    return stats
+
+def invalidate_dashboard():
+    """Drop cached stats after complaints or buildings change"""
+    dashboard_cache.delete("stats")
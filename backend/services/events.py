@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+REDIS_CHANNEL = "complaint-events"
+
+class Subscription:
+    """A subscriber's bounded event queue; slow consumers lose the oldest events"""
+
+    def __init__(self, broker, predicate):
+        self.broker = broker
+        self.predicate = predicate
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        if not self.predicate(event):
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Next event, or None if nothing arrives within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class EventBroker:
+    """In-process fan-out of events to the subscribers of this worker"""
+
+    def __init__(self):
+        self._subscriptions = set()
+
+    def subscribe(self, predicate=lambda event: True):
+        subscription = Subscription(self, predicate)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    def _deliver(self, event):
+        for subscription in list(self._subscriptions):
+            subscription.offer(event)
+
+    async def publish(self, event):
+        self._deliver(event)
+
+class RedisEventBroker(EventBroker):
+    """Fans events out across processes through a Redis pub/sub channel.
+
+    Publishing goes through Redis and every process delivers what it hears on
+    the channel to its own subscribers. If Redis is unreachable events are
+    still delivered locally.
+    """
+
+    def __init__(self, url=None, channel=REDIS_CHANNEL):
+        import redis.asyncio as redis
+
+        super().__init__()
+        self.channel = channel
+        self._client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self._errors = redis.RedisError
+        self._listener = None
+
+    def subscribe(self, predicate=lambda event: True):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(predicate)
+
+    async def publish(self, event):
+        try:
+            await self._client.publish(self.channel, json.dumps(event, default=str))
+        except self._errors:
+            logger.warning("Redis publish failed, delivering event locally only", exc_info=True)
+            self._deliver(event)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._deliver(json.loads(message["data"]))
+            except self._errors:
+                logger.warning("Redis event listener disconnected, retrying", exc_info=True)
+                await asyncio.sleep(1)
+
+def make_event_broker():
+    """Build the broker selected by EVENT_BACKEND (memory or redis)"""
+    if os.getenv("EVENT_BACKEND", "memory") == "redis":
+        return RedisEventBroker()
+    return EventBroker()
+
+broker = make_event_broker()
+
+def complaint_event(event_type, complaint):
+    """Event payload for a complaint; carries the ids used for role filtering"""
+    return {
+        "type": event_type,
+        "complaint_id": complaint.id,
+        "status": complaint.status,
+        "category": complaint.category,
+        "urgency_level": complaint.urgency_level,
+        "priority_score": complaint.priority_score,
+        "user_id": complaint.user_id,
+        "assigned_worker_id": complaint.assigned_worker_id
+    }
+
+def visible_to(user):
+    """Event filter matching the complaint list's role rules"""
+    if user.role == "resident":
+        return lambda event: event.get("user_id") == user.id
+    if user.role == "worker":
+        return lambda event: event.get("assigned_worker_id") == user.id
+    return lambda event: True
@@ -0,0 +1,150 @@
+import io
+from functools import lru_cache
+from sqlalchemy import func, select
+from config.database import SessionLocal
+from models.utility import UtilityConsumption
+from models.complaint import Complaint
+
+EXPORT_FORMATS = ("arrow", "parquet")
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet"
+}
+# Rows fetched from the server-side cursor and written per record batch / row group
+EXPORT_BATCH_SIZE = 65536
+
+# Schemas are built on first export so that importing the API does not load pyarrow
+@lru_cache(maxsize=None)
+def consumption_schema():
+    import pyarrow as pa
+    
+    return pa.schema([
+        ("id", pa.int32()),
+        ("building_id", pa.int32()),
+        ("utility_type", pa.string()),
+        ("consumption_value", pa.float64()),
+        ("unit", pa.string()),
+        ("recorded_date", pa.date32())
+    ])
+
+@lru_cache(maxsize=None)
+def complaint_schema():
+    import pyarrow as pa
+    
+    return pa.schema([
+        ("id", pa.int32()),
+        ("user_id", pa.int32()),
+        ("building_id", pa.int32()),
+        ("category", pa.string()),
+        ("title", pa.string()),
+        ("urgency_level", pa.string()),
+        ("status", pa.string()),
+        ("priority_score", pa.float64()),
+        ("assigned_worker_id", pa.int32()),
+        ("longitude", pa.float64()),
+        ("latitude", pa.float64()),
+        ("created_at", pa.timestamp("us")),
+        ("resolved_at", pa.timestamp("us"))
+    ])
+
+def consumption_query(building_ids=None, utility_types=None, start_date=None, end_date=None):
+    """Readings in consumption_schema() column order, filtered in SQL"""
+    query = select(*(getattr(UtilityConsumption, name) for name in consumption_schema().names))
+    if building_ids:
+        query = query.filter(UtilityConsumption.building_id.in_(building_ids))
+    if utility_types:
+        query = query.filter(UtilityConsumption.utility_type.in_(utility_types))
+    if start_date:
+        query = query.filter(UtilityConsumption.recorded_date >= start_date)
+    if end_date:
+        query = query.filter(UtilityConsumption.recorded_date <= end_date)
+    return query.order_by(UtilityConsumption.building_id, UtilityConsumption.utility_type, UtilityConsumption.recorded_date)
+
+def complaint_query(building_ids=None, categories=None, start_date=None, end_date=None):
+    """Complaints in complaint_schema() column order, filtered in SQL"""
+    columns = {
+        "longitude": func.ST_X(Complaint.location),
+        "latitude": func.ST_Y(Complaint.location)
+    }
+    query = select(*(columns[name] if name in columns else getattr(Complaint, name) for name in complaint_schema().names))
+    if building_ids:
+        query = query.filter(Complaint.building_id.in_(building_ids))
+    if categories:
+        query = query.filter(Complaint.category.in_(categories))
+    if start_date:
+        query = query.filter(Complaint.created_at >= start_date)
+    if end_date:
+        query = query.filter(func.date(Complaint.created_at) <= end_date)
+    return query.order_by(Complaint.id)
+
+def record_batches(db, query, schema, batch_size=EXPORT_BATCH_SIZE):
+    """Yield Arrow record batches from a server-side cursor, batch_size rows at a time"""
+    import pyarrow as pa
+    
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.partitions():
+        columns = zip(*rows)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back to the caller in chunks"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_export(batches, schema, format="arrow"):
+    """Encode record batches as an Arrow IPC stream or a Parquet file, yielding bytes as they are produced"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema) if format == "parquet" else pa.ipc.new_stream(sink, schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
+
+def export_response_body(query, schema, format="arrow"):
+    """Stream an export over its own session, for use as a StreamingResponse body"""
+    db = SessionLocal()
+    try:
+        yield from stream_export(record_batches(db, query, schema), schema, format)
+    finally:
+        db.close()
+
+def write_export(batches, schema, path, format="arrow"):
+    """Write record batches to a file; Arrow files can be memory-mapped for zero-copy reads"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if format == "parquet":
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
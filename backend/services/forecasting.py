@@ -0,0 +1,123 @@
+import math
+import os
+from sqlalchemy import func, and_
+from models.utility import UtilityConsumption
+from models.rollup import ConsumptionRollup
+from ml.forecaster import FAST_MODELS, FREQUENCIES, forecast_many
+from services.cache import LRUCache
+
+MIN_HISTORY = 10
+FORECAST_MODELS = ("prophet",) + FAST_MODELS
+# Used by both the nightly batch and on-demand predictions, so that by default
+# predictions are served from the precomputed forecasts
+DEFAULT_FORECAST_MODEL = os.getenv("DEFAULT_FORECAST_MODEL", "holt_winters")
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30}
+
+forecast_cache = LRUCache(
+    max_entries=int(os.getenv("FORECAST_CACHE_SIZE", "512")),
+    cache_dir=os.getenv("FORECAST_CACHE_DIR") or None
+)
+
+def _series_filter(building_id: int, utility_type: str):
+    return and_(
+        UtilityConsumption.building_id == building_id,
+        UtilityConsumption.utility_type == utility_type
+    )
+
+def series_version(db, building_id: int, utility_type: str):
+    """Return (latest recorded_date, row count, latest updated_at).
+
+    Added readings change the date or count, and readings corrected in place
+    by ingestion change updated_at.
+    """
+    return tuple(db.query(
+        func.max(UtilityConsumption.recorded_date),
+        func.count(UtilityConsumption.id),
+        func.max(UtilityConsumption.updated_at)
+    ).filter(_series_filter(building_id, utility_type)).one())
+
+def load_history(db, building_id: int, utility_type: str, granularity: str = "day"):
+    """Load a series as a Prophet-style ds/y DataFrame.
+
+    Weekly and monthly series are read from the rollup table instead of raw readings.
+    """
+    import pandas as pd
+    
+    if granularity != "day":
+        rows = db.query(
+            ConsumptionRollup.period_start,
+            ConsumptionRollup.total
+        ).filter(
+            ConsumptionRollup.building_id == building_id,
+            ConsumptionRollup.utility_type == utility_type,
+            ConsumptionRollup.granularity == granularity
+        ).order_by(ConsumptionRollup.period_start).all()
+        return pd.DataFrame(rows, columns=['ds', 'y'])
+    
+    rows = db.query(
+        UtilityConsumption.recorded_date,
+        UtilityConsumption.consumption_value
+    ).filter(
+        _series_filter(building_id, utility_type)
+    ).order_by(UtilityConsumption.recorded_date).all()
+    return pd.DataFrame(rows, columns=['ds', 'y'])
+
+def prophet_forecast(history, periods: int, granularity: str = "day"):
+    """Fit Prophet on a ds/y history and return the next `periods` predictions"""
+    # Prophet takes seconds to import; load it with the first fit, not at startup
+    from prophet import Prophet
+    
+    if granularity == "day":
+        model = Prophet(daily_seasonality=True, yearly_seasonality=True)
+    else:
+        model = Prophet(daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=True)
+    model.fit(history)
+    
+    future = model.make_future_dataframe(periods=periods, freq=FREQUENCIES[granularity][0])
+    forecast = model.predict(future).tail(periods)
+    
+    return [
+        {
+            'date': row.ds.strftime('%Y-%m-%d'),
+            'predicted_value': row.yhat,
+            'lower_bound': row.yhat_lower,
+            'upper_bound': row.yhat_upper
+        }
+        for row in forecast.itertuples()
+    ]
+
+def fit_forecast(history, periods: int, model: str = DEFAULT_FORECAST_MODEL, granularity: str = "day"):
+    """Forecast a single ds/y history with the selected model"""
+    if model == "prophet":
+        return prophet_forecast(history, periods, granularity)
+    return forecast_many([history], periods, model, granularity)[0]
+
+def forecast_cache_key(db, building_id: int, utility_type: str, days: int, model: str, granularity: str):
+    """Key of the series' forecast at its current version, or None when the series is too short to forecast"""
+    version = series_version(db, building_id, utility_type)
+    if version[1] < MIN_HISTORY:
+        return None
+    return (building_id, utility_type, days, model, granularity) + version
+
+def peek_forecast(db, building_id: int, utility_type: str, days: int, model: str = DEFAULT_FORECAST_MODEL, granularity: str = "day"):
+    """Return (key, cached predictions or None) without fitting; key is None when the series is too short"""
+    key = forecast_cache_key(db, building_id, utility_type, days, model, granularity)
+    return key, None if key is None else forecast_cache.get(key)
+
+def cached_forecast(db, building_id: int, utility_type: str, days: int, model: str = DEFAULT_FORECAST_MODEL, granularity: str = "day"):
+    """Return forecasts covering `days` for a series, refitting only when its readings have changed.
+
+    Returns None when the series is too short to forecast.
+    """
+    key, predictions = peek_forecast(db, building_id, utility_type, days, model, granularity)
+    if key is None:
+        return None
+    
+    if predictions is None:
+        history = load_history(db, building_id, utility_type, granularity)
+        if len(history) < MIN_HISTORY:
+            return None
+        periods = math.ceil(days / PERIOD_DAYS[granularity])
+        predictions = fit_forecast(history, periods, model, granularity)
+        forecast_cache.set(key, predictions)
+    return predictions
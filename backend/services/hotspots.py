@@ -0,0 +1,115 @@
+import math
+import os
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import text
+
+# Edge of the finest grid cell in Web Mercator metres. complaint_hotspots is
+# keyed by cells of this size, so changing it requires rebuild_hotspots().
+CELL_METERS = float(os.getenv("HOTSPOT_CELL_METERS", "250"))
+# Coarser grids are served by merging blocks of up to this many cells per side
+MAX_RESOLUTION = 64
+MERCATOR_RADIUS = 6378137.0
+
+def _cell(column: str):
+    return f"floor(ST_{column}(ST_Transform(c.location, 3857)) / :cell_meters)::integer"
+
+_SELECT_CELLS = f"""
+    SELECT c.category, c.created_at::date, {_cell('X')}, {_cell('Y')}, count(*)
+    FROM complaints c
+    WHERE c.location IS NOT NULL
+"""
+
+_RECORD_COMPLAINT = text(f"""
+    INSERT INTO complaint_hotspots (category, day, cell_x, cell_y, complaint_count)
+    {_SELECT_CELLS} AND c.id = :complaint_id
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (category, day, cell_x, cell_y)
+    DO UPDATE SET complaint_count = complaint_hotspots.complaint_count + EXCLUDED.complaint_count
+""")
+
+# Blocks record_complaint (ROW EXCLUSIVE) until the rebuild commits, after
+# waiting for complaints already counted in; anything inserted meanwhile is
+# either in the rebuild's snapshot or added on top of it once the lock drops
+_LOCK_HOTSPOTS = text("LOCK TABLE complaint_hotspots IN SHARE ROW EXCLUSIVE MODE")
+
+_REBUILD = text(f"""
+    INSERT INTO complaint_hotspots (category, day, cell_x, cell_y, complaint_count)
+    {_SELECT_CELLS}
+    GROUP BY 1, 2, 3, 4
+""")
+
+def record_complaint(db, complaint_id: int):
+    """Count a newly inserted complaint into its grid cell, in the caller's transaction"""
+    db.execute(_RECORD_COMPLAINT, {"complaint_id": complaint_id, "cell_meters": CELL_METERS})
+
+def rebuild_hotspots(db):
+    """Recount complaint_hotspots from scratch, e.g. after changing HOTSPOT_CELL_METERS"""
+    db.execute(_LOCK_HOTSPOTS)
+    db.execute(text("DELETE FROM complaint_hotspots"))
+    db.execute(_REBUILD, {"cell_meters": CELL_METERS})
+    db.commit()
+
+def _to_mercator(lon, lat):
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = MERCATOR_RADIUS * math.radians(lon)
+    y = MERCATOR_RADIUS * math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+    return x, y
+
+def find_hotspots(db, days=30, category=None, bbox=None, resolution=1, min_count=1):
+    """Aggregate the hotspot grid over the last `days` days.
+
+    `resolution` merges resolution x resolution blocks of base cells. Each
+    cell reports its complaint count, density in complaints per square
+    kilometre of ground and a score relative to the mean non-empty cell,
+    so values above 1 stand out from the background.
+    """
+    size = CELL_METERS * resolution
+    clauses = ["day >= :since"]
+    params = {"since": date.today() - timedelta(days=days - 1), "resolution": resolution, "min_count": min_count}
+    if category:
+        clauses.append("category = :category")
+        params["category"] = category
+    if bbox:
+        min_x, min_y = _to_mercator(bbox[0], bbox[1])
+        max_x, max_y = _to_mercator(bbox[2], bbox[3])
+        clauses.append("cell_x BETWEEN :min_cx AND :max_cx AND cell_y BETWEEN :min_cy AND :max_cy")
+        params.update(
+            min_cx=math.floor(min_x / CELL_METERS), max_cx=math.floor(max_x / CELL_METERS),
+            min_cy=math.floor(min_y / CELL_METERS), max_cy=math.floor(max_y / CELL_METERS)
+        )
+
+    rows = db.execute(text(f"""
+        SELECT floor(cell_x::float8 / :resolution)::integer AS gx,
+               floor(cell_y::float8 / :resolution)::integer AS gy,
+               sum(complaint_count) AS complaints
+        FROM complaint_hotspots
+        WHERE {" AND ".join(clauses)}
+        GROUP BY 1, 2
+        HAVING sum(complaint_count) >= :min_count
+    """), params).all()
+    if not rows:
+        return []
+
+    gx, gy, counts = (np.array(column, dtype=float) for column in zip(*rows))
+    lon = np.degrees((gx + 0.5) * size / MERCATOR_RADIUS)
+    lat = np.degrees(2 * np.arctan(np.exp((gy + 0.5) * size / MERCATOR_RADIUS)) - np.pi / 2)
+    # Mercator stretches both axes by 1 / cos(lat)
+    area_km2 = (size * np.cos(np.radians(lat)) / 1000) ** 2
+    density = counts / area_km2
+    score = counts / counts.mean()
+
+    order = np.argsort(-counts, kind="stable")
+    return [
+        {
+            "cell_x": int(gx[i]),
+            "cell_y": int(gy[i]),
+            "longitude": float(lon[i]),
+            "latitude": float(lat[i]),
+            "cell_meters": size,
+            "complaints": int(counts[i]),
+            "density": float(density[i]),
+            "score": float(score[i])
+        }
+        for i in order
+    ]
@@ -0,0 +1,133 @@
+import io
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from models.building import Building
+from services.rollups import refresh_rollups_from_staging
+
+UTILITY_TYPES = ("water", "electricity", "gas")
+COLUMNS = ['building_id', 'utility_type', 'consumption_value', 'unit', 'recorded_date']
+BATCH_SIZE = 50000
+MAX_REPORTED_REJECTS = 100
+
+_STAGING_DDL = text("""
+    CREATE TEMP TABLE IF NOT EXISTS utility_consumption_staging (
+        line BIGINT NOT NULL,
+        building_id INTEGER NOT NULL,
+        utility_type VARCHAR(50) NOT NULL,
+        consumption_value FLOAT NOT NULL,
+        unit VARCHAR(20) NOT NULL,
+        recorded_date DATE NOT NULL
+    ) ON COMMIT DELETE ROWS
+""")
+
+# DISTINCT ON keeps the last reading for a key within a batch, since ON CONFLICT
+# cannot touch the same row twice in one statement
+_UPSERT = text("""
+    WITH upserted AS (
+        INSERT INTO utility_consumption (building_id, utility_type, consumption_value, unit, recorded_date)
+        SELECT DISTINCT ON (building_id, utility_type, recorded_date)
+               building_id, utility_type, consumption_value, unit, recorded_date
+        FROM utility_consumption_staging
+        ORDER BY building_id, utility_type, recorded_date, line DESC
+        ON CONFLICT (building_id, utility_type, recorded_date)
+        DO UPDATE SET consumption_value = EXCLUDED.consumption_value, unit = EXCLUDED.unit, updated_at = now()
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+""")
+
+def read_batches(stream, file_format: str, batch_size: int = BATCH_SIZE):
+    """Yield DataFrames of raw string values from a CSV or NDJSON byte stream"""
+    if file_format == "csv":
+        reader = pd.read_csv(stream, dtype=str, chunksize=batch_size)
+    elif file_format == "ndjson":
+        reader = pd.read_json(stream, lines=True, dtype=False, chunksize=batch_size)
+    else:
+        raise ValueError("format must be csv or ndjson")
+    for batch in reader:
+        yield batch
+
+def validate_batch(batch, first_line: int, building_ids):
+    """Apply the UtilityConsumptionCreate rules to a whole batch at once.
+
+    Returns the clean rows (with their source line numbers) and a list of
+    (line, error) tuples for rejected rows.
+    """
+    missing = [column for column in COLUMNS if column not in batch.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    
+    lines = pd.Series(np.arange(first_line, first_line + len(batch)), index=batch.index)
+    building_id = pd.to_numeric(batch['building_id'], errors='coerce')
+    consumption_value = pd.to_numeric(batch['consumption_value'], errors='coerce')
+    recorded_date = pd.to_datetime(batch['recorded_date'], format='ISO8601', errors='coerce')
+    unit = batch['unit'].astype('string').str.strip()
+    
+    errors = pd.Series(None, index=batch.index, dtype=object)
+    checks = [
+        (building_id.isna() | (building_id % 1 != 0), "building_id must be an integer"),
+        (~building_id.isin(building_ids), "building_id does not exist"),
+        (~batch['utility_type'].isin(UTILITY_TYPES), f"utility_type must be one of: {', '.join(UTILITY_TYPES)}"),
+        (consumption_value.isna() | ~np.isfinite(consumption_value), "consumption_value must be a number"),
+        (unit.isna() | (unit == "") | (unit.str.len() > 20), "unit is required (max 20 characters)"),
+        (recorded_date.isna(), "recorded_date must be an ISO date")
+    ]
+    for failed, message in checks:
+        errors[failed.fillna(True).astype(bool) & errors.isna()] = message
+    
+    valid = errors.isna()
+    clean = pd.DataFrame({
+        'line': lines[valid],
+        'building_id': building_id[valid].astype('int64'),
+        'utility_type': batch['utility_type'][valid],
+        'consumption_value': consumption_value[valid],
+        'unit': unit[valid],
+        'recorded_date': recorded_date[valid].dt.strftime('%Y-%m-%d')
+    })
+    rejects = list(zip(lines[~valid].tolist(), errors[~valid].tolist()))
+    return clean, rejects
+
+def _copy_to_staging(db, clean):
+    buffer = io.StringIO()
+    clean.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY utility_consumption_staging (line, building_id, utility_type, consumption_value, unit, recorded_date) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def ingest_readings(db, stream, file_format: str, batch_size: int = BATCH_SIZE):
+    """Stream readings into utility_consumption through COPY and a staging upsert.
+
+    Each batch is validated, copied and committed on its own, so memory stays
+    bounded by batch_size regardless of file size.
+    """
+    building_ids = {building_id for (building_id,) in db.query(Building.id)}
+    report = {"rows": 0, "inserted": 0, "updated": 0, "rejected": 0, "rejects": []}
+    first_line = 2 if file_format == "csv" else 1
+    
+    for batch in read_batches(stream, file_format, batch_size):
+        clean, rejects = validate_batch(batch, first_line, building_ids)
+        first_line += len(batch)
+        report["rows"] += len(batch)
+        report["rejected"] += len(rejects)
+        room = MAX_REPORTED_REJECTS - len(report["rejects"])
+        report["rejects"].extend({"line": line, "error": error} for line, error in rejects[:room])
+        
+        if clean.empty:
+            continue
+        db.execute(_STAGING_DDL)
+        _copy_to_staging(db, clean)
+        inserted, updated = db.execute(_UPSERT).one()
+        refresh_rollups_from_staging(db)
+        db.commit()
+        report["inserted"] += inserted
+        report["updated"] += updated
+    
+    return report
@@ -0,0 +1,171 @@
+"""Work that runs in the job process pool.
+
+Every task is a module-level function so the spawned worker processes can
+import it, opens its own database session, and returns a JSON-serializable
+result.
+"""
+from typing import Callable, List, NamedTuple, Optional
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update
+from config.database import SessionLocal
+from models.complaint import Complaint
+from ml.complaint_prioritizer import ComplaintPrioritizer, get_prioritizer
+from services.forecasting import DEFAULT_FORECAST_MODEL, FORECAST_MODELS, cached_forecast
+from services.batch_forecast import run_batch_forecast
+from services.assignment import BACKLOG_LIMIT, MAX_BACKLOG_LIMIT, assign_backlog
+from services.dashboard import invalidate_dashboard
+from services.rollups import GRANULARITIES
+from services.tiles import expire_layer
+from services.versions import bump_version
+
+RESCORE_CHUNK_SIZE = 5000
+OPEN_STATUSES = ("open", "assigned", "in_progress")
+
+class ForecastParams(BaseModel):
+    building_id: int
+    utility_type: str
+    days: int = 30
+    model: str = DEFAULT_FORECAST_MODEL
+    granularity: str = "day"
+
+class BatchForecastParams(BaseModel):
+    days: int = 30
+    model: str = DEFAULT_FORECAST_MODEL
+    building_ids: Optional[List[int]] = None
+    utility_types: Optional[List[str]] = None
+
+class TrainingSample(BaseModel):
+    category: str
+    urgency_level: str
+    # Target score on the 0-100 scale calculate_priority returns
+    priority_score: float
+
+class TrainPrioritizerParams(BaseModel):
+    training_data: List[TrainingSample]
+    min_samples: int = 50
+
+class RescoreParams(BaseModel):
+    pass
+
+class AssignBacklogParams(BaseModel):
+    limit: int = BACKLOG_LIMIT
+
+def forecast_series(building_id, utility_type, days, model, granularity):
+    """Fit one series on demand; None when it is too short to forecast"""
+    db = SessionLocal()
+    try:
+        return cached_forecast(db, building_id, utility_type, days, model, granularity)
+    finally:
+        db.close()
+
+def batch_forecast(days, model, building_ids, utility_types):
+    db = SessionLocal()
+    try:
+        return run_batch_forecast(
+            db, days=days, model=model, building_ids=building_ids, utility_types=utility_types
+        )
+    finally:
+        db.close()
+
+def train_prioritizer(training_data, min_samples):
+    """Retrain the priority model on labelled samples supplied with the job.
+
+    Labels are the submitter's: how quickly a complaint happened to be
+    resolved says little about how urgent it was, so none are derived here.
+    """
+    if len(training_data) < min_samples:
+        raise ValueError(f"Training needs at least {min_samples} labelled samples, got {len(training_data)}")
+
+    ComplaintPrioritizer().train_model(training_data)
+    return {"samples": len(training_data)}
+
+def rescore_complaints():
+    """Recompute priority scores for all open complaints in vectorized chunks"""
+    import pandas as pd
+
+    prioritizer = get_prioritizer()
+    rescored = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(
+                select(Complaint.id, Complaint.category, Complaint.urgency_level).filter(
+                    Complaint.status.in_(OPEN_STATUSES),
+                    Complaint.id > last_id
+                ).order_by(Complaint.id).limit(RESCORE_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            chunk = pd.DataFrame(rows, columns=['id', 'category', 'urgency_level'])
+            chunk['priority_score'] = prioritizer.calculate_priority_batch(chunk)
+            db.execute(update(Complaint), chunk[['id', 'priority_score']].to_dict('records'))
+            db.commit()
+
+            rescored += len(rows)
+            last_id = rows[-1].id
+    finally:
+        db.close()
+    return {"rescored": rescored}
+
+def assign_complaints(limit):
+    """Plan and write assignments for the open backlog; the planning is CPU-bound"""
+    db = SessionLocal()
+    try:
+        return assign_backlog(db, limit)
+    finally:
+        db.close()
+
+def _assigned(result):
+    if result["assigned"]:
+        expire_layer("complaints")
+        invalidate_dashboard()
+        bump_version("complaints")
+
+def _rescored(result):
+    # priority_score is a tile attribute of every open complaint. This runs in
+    # the process that records completion, a job worker with JOB_BACKEND=redis,
+    # so invalidation goes through the version store (CACHE_BACKEND=redis)
+    # rather than this process's caches.
+    expire_layer("complaints")
+    bump_version("complaints")
+
+class JobType(NamedTuple):
+    params: type
+    run: Callable
+    admin_only: bool = True
+    on_success: Optional[Callable] = None
+
+JOB_TYPES = {
+    "forecast": JobType(ForecastParams, forecast_series, admin_only=False),
+    "batch_forecast": JobType(BatchForecastParams, batch_forecast),
+    "train_prioritizer": JobType(TrainPrioritizerParams, train_prioritizer),
+    "rescore": JobType(RescoreParams, rescore_complaints, on_success=_rescored),
+    "assign_backlog": JobType(AssignBacklogParams, assign_complaints, on_success=_assigned),
+}
+
+def parse_params(job_type: str, params: dict):
+    """Validate a submission, returning normalized params"""
+    if job_type not in JOB_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(JOB_TYPES)}")
+    try:
+        parsed = JOB_TYPES[job_type].params(**params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    model = getattr(parsed, "model", None)
+    if model is not None and model not in FORECAST_MODELS:
+        raise HTTPException(status_code=400, detail=f"model must be one of: {', '.join(FORECAST_MODELS)}")
+    limit = getattr(parsed, "limit", None)
+    if limit is not None and not 1 <= limit <= MAX_BACKLOG_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_BACKLOG_LIMIT}")
+    granularity = getattr(parsed, "granularity", None)
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    return parsed.dict()
+
+def run_job(job_type: str, params: dict):
+    """Process pool entry point"""
+    return JOB_TYPES[job_type].run(**params)
@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from services.auth import CurrentUser
+from services.job_tasks import JOB_TYPES, parse_params, run_job
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs and their results are kept this long
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+# A Redis job whose worker died stops blocking identical submissions after this long
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", "3600"))
+# How long a request that started a job waits for it before answering 202 Accepted
+JOB_WAIT_SECONDS = float(os.getenv("JOB_WAIT_SECONDS", "10"))
+REDIS_NAMESPACE = "jobs"
+
+# Join the in-flight job with the same key, or record, claim and enqueue a new
+# one, atomically so that a concurrent submitter never sees a claim without its
+# record. Returns the existing job's record, or nil when the new job was queued.
+# KEYS: in-flight key, new job's record, queue; ARGV: job id, record, claim
+# expiry, record key prefix
+_SUBMIT_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    local record = redis.call('GET', ARGV[4] .. existing)
+    if record then
+        return record
+    end
+end
+redis.call('SET', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('RPUSH', KEYS[3], ARGV[1])
+return false
+"""
+
+class JobStatus(BaseModel):
+    id: str
+    type: str
+    params: dict
+    status: str
+    submitted_by: Optional[int] = None
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+def job_key(job_type, params):
+    """Identical submissions share a key and are coalesced while in flight"""
+    payload = json.dumps([job_type, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def new_job(job_type, params, submitted_by=None):
+    return {
+        "id": uuid.uuid4().hex,
+        "type": job_type,
+        "params": params,
+        "key": job_key(job_type, params),
+        "status": "queued",
+        "submitted_by": submitted_by,
+        "submitted_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "error": None
+    }
+
+def _make_pool(workers, initializer=None, initargs=()):
+    # spawn avoids forking a process that holds database connections and threads
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs
+    )
+
+# Set in each LocalJobQueue worker process by _init_worker
+_started_queue = None
+
+def _init_worker(started_queue):
+    global _started_queue
+    _started_queue = started_queue
+
+def _run_reporting_start(job_id, run, *args):
+    """Process pool entry point that tells the API process when the job actually starts"""
+    _started_queue.put((job_id, time.time()))
+    return run(*args)
+
+def _finish(job, future):
+    """Mark a job done from its future, running the type's success hook; returns the result"""
+    job["finished_at"] = time.time()
+    try:
+        result = future.result()
+    except Exception as e:
+        logger.warning("Job %s (%s) failed", job["id"], job["type"], exc_info=True)
+        job["status"] = "failed"
+        job["error"] = f"{type(e).__name__}: {e}"
+        return None
+    job["status"] = "succeeded"
+    hook = JOB_TYPES[job["type"]].on_success
+    if hook is not None:
+        try:
+            hook(result)
+        except Exception:
+            logger.warning("Success hook for job %s failed", job["id"], exc_info=True)
+    return result
+
+class LocalJobQueue:
+    """Runs jobs in a process pool owned by this API process"""
+
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_RESULT_TTL):
+        self.workers = workers
+        self.ttl = ttl
+        self._pool = None
+        self._jobs = {}
+        self._results = {}
+        self._futures = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _new_pool(self):
+        if self._started is None:
+            self._started = multiprocessing.get_context("spawn").SimpleQueue()
+            threading.Thread(target=self._record_starts, args=(self._started,), daemon=True).start()
+        return _make_pool(self.workers, _init_worker, (self._started,))
+
+    def _submit_to_pool(self, job):
+        if self._pool is None:
+            self._pool = self._new_pool()
+        try:
+            return self._pool.submit(_run_reporting_start, job["id"], run_job, job["type"], job["params"])
+        except BrokenProcessPool:
+            # A worker died (for example OOM-killed); start a fresh pool
+            self._pool = self._new_pool()
+            return self._pool.submit(_run_reporting_start, job["id"], run_job, job["type"], job["params"])
+
+    def _record_starts(self, started):
+        """Mark jobs running as worker processes report picking them up; None stops the thread"""
+        while True:
+            message = started.get()
+            if message is None:
+                return
+            job_id, started_at = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job["started_at"] = started_at
+                # A fast job may have finished before its start was read
+                if job["status"] == "queued":
+                    job["status"] = "running"
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job["finished_at"] and job["finished_at"] < cutoff:
+                del self._jobs[job_id]
+                self._results.pop(job_id, None)
+                self._futures.pop(job_id, None)
+
+    async def submit(self, job_type, params, submitted_by=None):
+        key = job_key(job_type, params)
+        with self._lock:
+            self._expire()
+            if key in self._in_flight:
+                return dict(self._jobs[self._in_flight[key]])
+            job = new_job(job_type, params, submitted_by)
+            self._jobs[job["id"]] = job
+            self._in_flight[key] = job["id"]
+            future = self._submit_to_pool(job)
+            self._futures[job["id"]] = future
+        future.add_done_callback(lambda future: self._done(job, future))
+        return dict(job)
+
+    def _done(self, job, future):
+        with self._lock:
+            result = _finish(job, future)
+            self._results[job["id"]] = result
+            self._in_flight.pop(job["key"], None)
+
+    def get_now(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    async def get(self, job_id):
+        return self.get_now(job_id)
+
+    async def result(self, job_id):
+        return self._results.get(job_id)
+
+    async def wait(self, job_id, timeout):
+        """The job once finished, or its current state after timeout seconds"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            # _done was registered first, so the record is final once this resolves
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except Exception:
+                # Timed out, or the job failed; the record says which
+                pass
+        return self.get_now(job_id)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._started is not None:
+            self._started.put(None)
+
+class RedisJobQueue:
+    """Queues jobs in Redis for 'python cli.py worker' processes on any node.
+
+    Job records, results and in-flight keys live under the jobs namespace; the
+    queue itself is a Redis list consumed with BLPOP.
+    """
+
+    def __init__(self, url=None, namespace=REDIS_NAMESPACE, ttl=JOB_RESULT_TTL):
+        import redis.asyncio as redis
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self._submit = self._client.register_script(_SUBMIT_SCRIPT)
+
+    def _key(self, *parts):
+        return ":".join((self.namespace,) + parts)
+
+    async def submit(self, job_type, params, submitted_by=None):
+        job = new_job(job_type, params, submitted_by)
+        existing = await self._submit(
+            keys=[self._key("inflight", job["key"]), self._key("job", job["id"]), self._key("queue")],
+            args=[job["id"], json.dumps(job), JOB_TIMEOUT, self._key("job", "")]
+        )
+        return job if existing is None else json.loads(existing)
+
+    async def get(self, job_id):
+        raw = await self._client.get(self._key("job", job_id))
+        return None if raw is None else json.loads(raw)
+
+    async def result(self, job_id):
+        raw = await self._client.get(self._key("result", job_id))
+        return None if raw is None else json.loads(raw)
+
+    async def wait(self, job_id, timeout, poll_interval=0.25):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None or job["status"] in ("succeeded", "failed") or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(poll_interval)
+
+    def shutdown(self):
+        pass
+
+def run_worker(workers=JOB_WORKERS, url=None, namespace=REDIS_NAMESPACE, ttl=JOB_RESULT_TTL):
+    """Consume the Redis queue, running up to `workers` jobs at a time"""
+    import redis
+
+    client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+    key = lambda *parts: ":".join((namespace,) + parts)
+    slots = threading.Semaphore(workers)
+
+    def done(job, future):
+        try:
+            result = _finish(job, future)
+            pipeline = client.pipeline()
+            pipeline.set(key("job", job["id"]), json.dumps(job), ex=ttl)
+            pipeline.set(key("result", job["id"]), json.dumps(result, default=str), ex=ttl)
+            pipeline.delete(key("inflight", job["key"]))
+            pipeline.execute()
+        except Exception:
+            logger.exception("Could not record the outcome of job %s", job["id"])
+        finally:
+            slots.release()
+
+    with _make_pool(workers) as pool:
+        while True:
+            slots.acquire()
+            try:
+                item = client.blpop(key("queue"), timeout=5)
+                raw = item and client.get(key("job", item[1].decode()))
+            except redis.RedisError:
+                slots.release()
+                logger.warning("Redis unavailable, retrying", exc_info=True)
+                time.sleep(1)
+                continue
+            if not raw:
+                slots.release()
+                continue
+
+            job = json.loads(raw)
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            client.set(key("job", job["id"]), json.dumps(job))
+            try:
+                future = pool.submit(run_job, job["type"], job["params"])
+            except BrokenProcessPool:
+                # Leave restarting to the process supervisor; the job can be resubmitted
+                job.update(status="failed", error="Worker pool crashed", finished_at=time.time())
+                client.set(key("job", job["id"]), json.dumps(job), ex=ttl)
+                client.delete(key("inflight", job["key"]))
+                raise
+            future.add_done_callback(lambda future, job=job: done(job, future))
+
+def make_job_queue():
+    """Build the queue selected by JOB_BACKEND (memory or redis)"""
+    if os.getenv("JOB_BACKEND", "memory") == "redis":
+        if os.getenv("CACHE_BACKEND", "memory") != "redis":
+            logger.warning("JOB_BACKEND=redis without CACHE_BACKEND=redis: caches that jobs invalidate will go stale")
+        return RedisJobQueue()
+    return LocalJobQueue()
+
+job_queue = make_job_queue()
+
+def check_job_access(job_type, current_user: CurrentUser):
+    if JOB_TYPES[job_type].admin_only and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+async def submit_job(job_type, params, current_user: CurrentUser):
+    """Validate and queue a job, or join the identical one already in flight"""
+    params = parse_params(job_type, params)
+    check_job_access(job_type, current_user)
+    return await job_queue.submit(job_type, params, submitted_by=current_user.id)
+
+def job_location(job):
+    return {"Location": f"/api/jobs/{job['id']}"}
@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+from sqlalchemy import text
+
+# Finest to coarsest
+GRANULARITIES = ("day", "week", "month")
+ROLLUP_EPOCH = date(2000, 1, 1)
+
+_COLUMNS = """
+    building_id, utility_type, granularity, period_start, reading_count, total, min_value, max_value,
+    sum_x, sum_xx, sum_xy, first_date, first_value, last_date, last_value
+"""
+
+_AGGREGATES = f"""
+    count(*), sum(u.consumption_value), min(u.consumption_value), max(u.consumption_value),
+    sum(u.recorded_date - DATE '{ROLLUP_EPOCH.isoformat()}'),
+    sum((u.recorded_date - DATE '{ROLLUP_EPOCH.isoformat()}')::float8 ^ 2),
+    sum((u.recorded_date - DATE '{ROLLUP_EPOCH.isoformat()}') * u.consumption_value),
+    min(u.recorded_date), (array_agg(u.consumption_value ORDER BY u.recorded_date))[1],
+    max(u.recorded_date), (array_agg(u.consumption_value ORDER BY u.recorded_date DESC))[1]
+"""
+
+_UPSERT = """
+    ON CONFLICT (building_id, utility_type, granularity, period_start) DO UPDATE SET
+        reading_count = EXCLUDED.reading_count,
+        total = EXCLUDED.total,
+        min_value = EXCLUDED.min_value,
+        max_value = EXCLUDED.max_value,
+        sum_x = EXCLUDED.sum_x,
+        sum_xx = EXCLUDED.sum_xx,
+        sum_xy = EXCLUDED.sum_xy,
+        first_date = EXCLUDED.first_date,
+        first_value = EXCLUDED.first_value,
+        last_date = EXCLUDED.last_date,
+        last_value = EXCLUDED.last_value
+"""
+
+def _refresh_periods_sql(affected: str):
+    """Recompute the rollup rows for every period touched by the (building_id, utility_type, recorded_date) rows of `affected`"""
+    return text(f"""
+        INSERT INTO utility_consumption_rollups ({_COLUMNS})
+        SELECT p.building_id, p.utility_type, p.granularity, p.period_start, {_AGGREGATES}
+        FROM (
+            SELECT DISTINCT a.building_id, a.utility_type, g.granularity,
+                   date_trunc(g.granularity, a.recorded_date)::date AS period_start
+            FROM ({affected}) AS a
+            CROSS JOIN (VALUES ('day'), ('week'), ('month')) AS g(granularity)
+        ) AS p
+        JOIN utility_consumption u
+          ON u.building_id = p.building_id
+         AND u.utility_type = p.utility_type
+         AND u.recorded_date >= p.period_start
+         AND u.recorded_date < p.period_start + ('1 ' || p.granularity)::interval
+        GROUP BY p.building_id, p.utility_type, p.granularity, p.period_start
+        {_UPSERT}
+    """)
+
+def _lock_series_sql(affected: str):
+    """Take a transaction-level advisory lock on every series in `affected`.
+
+    Refreshes recompute whole periods from the readings visible to their
+    statement, so two loads into the same series could otherwise each write
+    totals missing the other's rows. Waiting for the lock holder to commit
+    lets the later refresh see both. Locks are taken in a fixed order so
+    concurrent bulk loads cannot deadlock.
+    """
+    return text(f"""
+        SELECT pg_advisory_xact_lock(s.lock_key)
+        FROM (
+            SELECT DISTINCT hashtext(a.building_id || ':' || a.utility_type) AS lock_key
+            FROM ({affected}) AS a
+            ORDER BY lock_key
+        ) AS s
+    """)
+
+_STAGED = "SELECT building_id, utility_type, recorded_date FROM utility_consumption_staging"
+_READING = (
+    "SELECT CAST(:building_id AS INTEGER) AS building_id, CAST(:utility_type AS VARCHAR) AS utility_type, "
+    "CAST(:recorded_date AS DATE) AS recorded_date"
+)
+_BUILDING = (
+    "SELECT DISTINCT building_id, utility_type FROM utility_consumption "
+    "WHERE CAST(:building_id AS INTEGER) IS NULL OR building_id = :building_id"
+)
+
+_LOCK_STAGED = _lock_series_sql(_STAGED)
+_LOCK_READING = _lock_series_sql(_READING)
+_LOCK_BUILDING = _lock_series_sql(_BUILDING)
+_REFRESH_FROM_STAGING = _refresh_periods_sql(_STAGED)
+_REFRESH_FOR_READING = _refresh_periods_sql(_READING)
+
+# Periods whose readings were all deleted get no row from the backfill INSERT
+_CLEAR = text("""
+    DELETE FROM utility_consumption_rollups
+    WHERE CAST(:building_id AS INTEGER) IS NULL OR building_id = :building_id
+""")
+
+_BACKFILL = text(f"""
+    INSERT INTO utility_consumption_rollups ({_COLUMNS})
+    SELECT u.building_id, u.utility_type, g.granularity,
+           date_trunc(g.granularity, u.recorded_date)::date, {_AGGREGATES}
+    FROM utility_consumption u
+    CROSS JOIN (VALUES ('day'), ('week'), ('month')) AS g(granularity)
+    WHERE CAST(:building_id AS INTEGER) IS NULL OR u.building_id = :building_id
+    GROUP BY u.building_id, u.utility_type, g.granularity, date_trunc(g.granularity, u.recorded_date)
+    {_UPSERT}
+""")
+
+def refresh_rollups_from_staging(db):
+    """Update rollups for a bulk load; must run before the staging rows are committed away"""
+    db.execute(_LOCK_STAGED)
+    db.execute(_REFRESH_FROM_STAGING)
+
+def refresh_rollups_for_reading(db, building_id: int, utility_type: str, recorded_date: date):
+    params = {
+        "building_id": building_id,
+        "utility_type": utility_type,
+        "recorded_date": recorded_date
+    }
+    db.execute(_LOCK_READING, params)
+    db.execute(_REFRESH_FOR_READING, params)
+
+def backfill_rollups(db, building_ids=None):
+    """Rebuild rollups from raw readings, one transaction per building when ids are given"""
+    for building_id in building_ids or [None]:
+        db.execute(_LOCK_BUILDING, {"building_id": building_id})
+        db.execute(_CLEAR, {"building_id": building_id})
+        db.execute(_BACKFILL, {"building_id": building_id})
+        db.commit()
+
+def period_start(day: date, granularity: str):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def coarsest_granularity(start_date=None, end_date=None, allowed=GRANULARITIES):
+    """Pick the coarsest rollup whose periods exactly tile [start_date, end_date]"""
+    for granularity in reversed(allowed):
+        starts_aligned = start_date is None or period_start(start_date, granularity) == start_date
+        next_day = end_date + timedelta(days=1) if end_date else None
+        ends_aligned = next_day is None or period_start(next_day, granularity) == next_day
+        if starts_aligned and ends_aligned:
+            return granularity
+    return "day"
@@ -0,0 +1,36 @@
+import time
+from typing import Any
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from config.profiling import record_serialization
+
+RESPONSE_FORMATS = ("rows", "columnar")
+
+class TimedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that reports its render time to the request profile"""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            record_serialization(time.perf_counter() - start)
+
+def check_format(format: str):
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(RESPONSE_FORMATS)}")
+
+def list_response(fields, rows, format="rows", headers=None):
+    """Serialize column-only query rows with orjson, skipping per-row Pydantic models.
+
+    "rows" gives a list of objects keyed by the column labels in `fields`;
+    "columnar" gives one array per column, which is much smaller for long
+    lists because field names are not repeated.
+    """
+    fields = list(fields)
+    if format == "columnar":
+        columns = zip(*rows) if rows else ([] for _ in fields)
+        content = {field: list(values) for field, values in zip(fields, columns)}
+    else:
+        content = [dict(zip(fields, row)) for row in rows]
+    return TimedORJSONResponse(content, headers=headers)
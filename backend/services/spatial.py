@@ -0,0 +1,46 @@
+from fastapi import HTTPException
+from sqlalchemy import func
+
+SRID = 4326
+
+def parse_bbox(bbox: str):
+    """Parse a 'min_lon,min_lat,max_lon,max_lat' viewport string"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = [float(value) for value in bbox.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed maximums")
+    return min_lon, min_lat, max_lon, max_lat
+
+def make_point(lon: float, lat: float):
+    return func.ST_SetSRID(func.ST_MakePoint(lon, lat), SRID)
+
+def apply_spatial_filters(query, location, bbox=None, lat=None, lon=None, radius=None, nearest=None):
+    """Restrict a query to a viewport and/or radius and optionally order by distance.
+
+    Returns the filtered query and whether it was ordered for a k-nearest lookup.
+    All predicates are written so that PostGIS can answer them from the GIST
+    indexes on the location columns.
+    """
+    if (radius is not None or nearest is not None) and (lat is None or lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon are required for radius and nearest queries")
+    
+    if bbox:
+        # && is an index-only bounding box overlap test
+        query = query.filter(location.intersects(func.ST_MakeEnvelope(*parse_bbox(bbox), SRID)))
+    
+    if radius is not None:
+        # Metres on the spheroid; matches the geography(location) expression indexes
+        query = query.filter(func.ST_DWithin(
+            func.geography(location),
+            func.geography(make_point(lon, lat)),
+            radius
+        ))
+    
+    if nearest is not None:
+        # <-> lets the GIST index return rows in distance order
+        query = query.order_by(location.distance_centroid(make_point(lon, lat))).limit(nearest)
+        return query, True
+    
+    return query, False
@@ -0,0 +1,117 @@
+import math
+import os
+from sqlalchemy import text
+from services.cache import LRUCache
+from services.versions import bump_version, table_versions
+
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 20
+# At or below this zoom points are aggregated into grid clusters
+CLUSTER_MAX_ZOOM = int(os.getenv("TILE_CLUSTER_MAX_ZOOM", "13"))
+# Cluster cell size in tile pixels (out of EXTENT)
+CLUSTER_CELL = 256
+WEB_MERCATOR_WIDTH = 40075016.685578488
+
+LAYERS = {
+    "complaints": {
+        "table": "complaints",
+        "columns": ["id", "category", "status", "urgency_level", "priority_score"],
+    },
+    "buildings": {
+        "table": "buildings",
+        "columns": ["id", "name", "building_type"],
+    },
+}
+
+tile_cache = LRUCache(
+    max_entries=int(os.getenv("TILE_CACHE_SIZE", "2048")),
+    cache_dir=os.getenv("TILE_CACHE_DIR") or None
+)
+
+def _tile_sql(layer: str, z: int):
+    config = LAYERS[layer]
+    if z <= CLUSTER_MAX_ZOOM:
+        source = f"""
+            SELECT clusters.point_count,
+                   ST_AsMVTGeom(clusters.center, bounds.geom, {EXTENT}, {BUFFER}, true) AS geom
+            FROM (
+                SELECT count(*) AS point_count, ST_Centroid(ST_Collect(pts.geom)) AS center
+                FROM (
+                    SELECT ST_Transform(src.location, 3857) AS geom
+                    FROM {config['table']} AS src, bounds
+                    WHERE src.location && bounds.geom_4326
+                ) AS pts
+                GROUP BY ST_SnapToGrid(pts.geom, :cell_size)
+            ) AS clusters, bounds
+        """
+    else:
+        columns = ", ".join(f"src.{column}" for column in config["columns"])
+        source = f"""
+            SELECT {columns},
+                   ST_AsMVTGeom(ST_Transform(src.location, 3857), bounds.geom, {EXTENT}, {BUFFER}, true) AS geom
+            FROM {config['table']} AS src, bounds
+            WHERE src.location && bounds.geom_4326
+        """
+    return text(f"""
+        WITH bounds AS (
+            SELECT ST_TileEnvelope(:z, :x, :y) AS geom,
+                   ST_Transform(ST_TileEnvelope(:z, :x, :y, margin => {BUFFER / EXTENT}), 4326) AS geom_4326
+        )
+        SELECT ST_AsMVT(mvt, :layer, {EXTENT}, 'geom') FROM ({source}) AS mvt
+    """)
+
+def _generation(layer: str):
+    """Current generation of a layer's cached tiles, or None when the version store is unavailable"""
+    stamps = table_versions.get([f"tiles:{layer}"])
+    return stamps and stamps[0][0]
+
+def expire_layer(layer: str):
+    """Invalidate every cached tile of a layer.
+
+    Cached tiles are keyed by the layer's generation in the version store, so
+    this reaches every process sharing the store, including job workers.
+    """
+    bump_version(f"tiles:{layer}")
+
+async def build_tile(db, layer: str, z: int, x: int, y: int) -> bytes:
+    """Return the MVT bytes for a tile, rendering it in PostGIS on a cache miss"""
+    generation = _generation(layer)
+    key = (layer, generation, z, x, y)
+    if generation is not None:
+        tile = tile_cache.get(key)
+        if tile is not None:
+            return tile
+    
+    cell_size = WEB_MERCATOR_WIDTH / (2 ** z) * CLUSTER_CELL / EXTENT
+    tile = (await db.execute(
+        _tile_sql(layer, z),
+        {"z": z, "x": x, "y": y, "layer": layer, "cell_size": cell_size}
+    )).scalar()
+    tile = bytes(tile or b"")
+    if generation is not None:
+        tile_cache.set(key, tile)
+    return tile
+
+def tiles_for_point(lon: float, lat: float, z: int):
+    """Yield the tiles at zoom z whose buffered extent contains the point"""
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    fx = (lon + 180.0) / 360.0 * n
+    fy = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    margin = BUFFER / EXTENT
+    xs = {math.floor(fx), math.floor(fx + margin), math.floor(fx - margin)}
+    ys = {math.floor(fy), math.floor(fy + margin), math.floor(fy - margin)}
+    for x in xs:
+        for y in ys:
+            if 0 <= x < n and 0 <= y < n:
+                yield x, y
+
+def invalidate_point(layer: str, lon: float, lat: float):
+    """Drop every cached tile of a layer that could render the given point"""
+    generation = _generation(layer)
+    if generation is None:
+        return
+    for z in range(MAX_ZOOM + 1):
+        for x, y in tiles_for_point(lon, lat, z):
+            tile_cache.delete((layer, generation, z, x, y))
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Request, Response
+from services.auth import CurrentUser, get_current_user
+
+logger = logging.getLogger(__name__)
+
+class LocalVersionStore:
+    """Per-process write counters and last-modified times for tables.
+
+    Writes made by other API workers, the CLI or job workers never reach these
+    counters, so they only version caches private to this process.
+    """
+    shared = False
+
+    def __init__(self):
+        # A restart loses the counters, so ETags from a previous process never match
+        self._boot = uuid.uuid4().hex[:8]
+        self._started = time.time()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, tables):
+        with self._lock:
+            return [
+                (f"{self._boot}.{count}", modified)
+                for count, modified in (self._versions.get(table, (0, self._started)) for table in tables)
+            ]
+
+    def bump(self, *tables):
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                count, _ = self._versions.get(table, (0, now))
+                self._versions[table] = (count + 1, now)
+
+class RedisVersionStore:
+    """Write counters shared by every API process through Redis"""
+    shared = True
+
+    def __init__(self, namespace="versions", url=None):
+        import redis
+
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+        self._errors = redis.RedisError
+
+    def get(self, tables):
+        try:
+            values = self._client.mget(
+                [f"{self.namespace}:{table}:count" for table in tables] +
+                [f"{self.namespace}:{table}:modified" for table in tables]
+            )
+        except self._errors:
+            logger.warning("Redis version read failed", exc_info=True)
+            return None
+        counts, modified = values[:len(tables)], values[len(tables):]
+        if None in counts or None in modified:
+            # Never written, or Redis lost its data: start from a random counter
+            # so ETags issued before the loss cannot match again
+            self._initialize(tables)
+            return None
+        return [(int(count), float(ts)) for count, ts in zip(counts, modified)]
+
+    def _initialize(self, tables):
+        try:
+            pipeline = self._client.pipeline()
+            for table in tables:
+                pipeline.set(f"{self.namespace}:{table}:count", random.getrandbits(48), nx=True)
+                pipeline.set(f"{self.namespace}:{table}:modified", time.time(), nx=True)
+            pipeline.execute()
+        except self._errors:
+            logger.warning("Redis version initialization failed for %s", tables, exc_info=True)
+
+    def bump(self, *tables):
+        now = time.time()
+        try:
+            pipeline = self._client.pipeline()
+            for table in tables:
+                pipeline.incr(f"{self.namespace}:{table}:count")
+                pipeline.set(f"{self.namespace}:{table}:modified", now)
+            pipeline.execute()
+        except self._errors:
+            logger.warning("Redis version bump failed for %s", tables, exc_info=True)
+
+def make_version_store():
+    """Build the store selected by CACHE_BACKEND (memory or redis)"""
+    if os.getenv("CACHE_BACKEND", "memory") == "redis":
+        return RedisVersionStore()
+    return LocalVersionStore()
+
+table_versions = make_version_store()
+
+def bump_version(*tables):
+    """Record a write to tables, invalidating ETags derived from them"""
+    table_versions.bump(*tables)
+
+def _etag_matches(header, etag):
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+def conditional_get(*tables, daily=False):
+    """Dependency answering 304 Not Modified while `tables` have not been written.
+
+    The ETag combines the tables' versions with the request path and query,
+    plus today's date for endpoints whose window moves daily, so it only suits
+    responses that are the same for every user. Unchanged data is answered
+    before the route body runs.
+
+    Only active with CACHE_BACKEND=redis: per-process counters miss writes
+    from other processes and would keep answering 304 for changed data.
+    """
+    async def dependency(
+        request: Request,
+        response: Response,
+        current_user: CurrentUser = Depends(get_current_user)
+    ):
+        if not table_versions.shared:
+            return
+        stamps = table_versions.get(tables)
+        if stamps is None:
+            return
+
+        key = repr((stamps, request.url.path, sorted(request.query_params.multi_items()),
+                    date.today().isoformat() if daily else None))
+        etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+        last_modified = max(modified for _, modified in stamps)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": "private, no-cache"
+        }
+
+        if_none_match = request.headers.get("If-None-Match")
+        if_modified_since = request.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        elif if_modified_since is not None and not daily:
+            try:
+                not_modified = int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        if not_modified:
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ml.forecaster import FREQUENCIES, forecast_many
+
+# Added to a trend, so exact forecasts show the seasonals were de-trended
+WEEKLY_PATTERN = np.array([0.0, 3.0, -2.0, 5.0, -4.0, 1.0, -3.0])
+
+def _forecast(values, granularity, periods):
+    freq = FREQUENCIES[granularity][0]
+    history = pd.DataFrame({
+        'ds': pd.date_range('2024-01-01', periods=len(values), freq=freq),
+        'y': values
+    })
+    return [p['predicted_value'] for p in forecast_many([history], periods, "holt_winters", granularity)[0]]
+
+@pytest.mark.parametrize("length", [10, 14, 60])
+def test_daily_linear_series_continues_its_trend(length):
+    values = 100 + 5 * np.arange(length)
+    expected = 100 + 5 * np.arange(length, length + 3)
+    np.testing.assert_allclose(_forecast(values, "day", 3), expected, atol=1e-6)
+
+def test_daily_linear_plus_seasonal_series():
+    t = np.arange(56)
+    values = 100 + 2 * t + WEEKLY_PATTERN[t % 7]
+    future = np.arange(56, 63)
+    expected = 100 + 2 * future + WEEKLY_PATTERN[future % 7]
+    np.testing.assert_allclose(_forecast(values, "day", 7), expected, atol=1e-6)
+
+@pytest.mark.parametrize("granularity,length,intercept,slope", [
+    ("week", 30, 100, 1),
+    ("week", 200, 0, 1),
+    ("month", 36, 100, 1),
+])
+def test_rollup_frequency_linear_series(granularity, length, intercept, slope):
+    values = intercept + slope * np.arange(length, dtype=float)
+    expected = intercept + slope * np.arange(length, length + 3)
+    np.testing.assert_allclose(_forecast(values, granularity, 3), expected, atol=1e-6)
+
+def test_flat_seasonal_series_repeats_its_pattern():
+    t = np.arange(42)
+    values = 50 + WEEKLY_PATTERN[t % 7]
+    future = np.arange(42, 49)
+    np.testing.assert_allclose(_forecast(values, "day", 7), 50 + WEEKLY_PATTERN[future % 7], atol=1e-6)
@@ -38,7 +38,7 @@ CREATE TABLE complaints (
     status VARCHAR(20) NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'assigned', 'in_progress', 'resolved', 'closed')),
     assigned_worker_id INTEGER REFERENCES users(id),
     image_url VARCHAR(500),
-    priority_score FLOAT DEFAULT 0,
+    priority_score FLOAT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     resolved_at TIMESTAMP
@@ -52,7 +52,65 @@ CREATE TABLE utility_consumption (
     consumption_value FLOAT NOT NULL,
     unit VARCHAR(20) NOT NULL,
     recorded_date DATE NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_utility_consumption_reading UNIQUE (building_id, utility_type, recorded_date)
+);
+
+-- Daily, weekly and monthly consumption rollups
+CREATE TABLE utility_consumption_rollups (
+    building_id INTEGER NOT NULL REFERENCES buildings(id),
+    utility_type VARCHAR(50) NOT NULL,
+    granularity VARCHAR(10) NOT NULL CHECK (granularity IN ('day', 'week', 'month')),
+    period_start DATE NOT NULL,
+    reading_count INTEGER NOT NULL,
+    total FLOAT NOT NULL,
+    min_value FLOAT NOT NULL,
+    max_value FLOAT NOT NULL,
+    sum_x FLOAT NOT NULL,
+    sum_xx FLOAT NOT NULL,
+    sum_xy FLOAT NOT NULL,
+    first_date DATE NOT NULL,
+    first_value FLOAT NOT NULL,
+    last_date DATE NOT NULL,
+    last_value FLOAT NOT NULL,
+    PRIMARY KEY (building_id, utility_type, granularity, period_start)
+);
+
+-- Precomputed consumption forecasts
+CREATE TABLE consumption_forecasts (
+    id SERIAL PRIMARY KEY,
+    building_id INTEGER NOT NULL REFERENCES buildings(id),
+    utility_type VARCHAR(50) NOT NULL,
+    model VARCHAR(50) NOT NULL,
+    forecast_date DATE NOT NULL,
+    predicted_value FLOAT NOT NULL,
+    lower_bound FLOAT NOT NULL,
+    upper_bound FLOAT NOT NULL,
+    history_end DATE NOT NULL,
+    history_rows INTEGER NOT NULL,
+    history_updated_at TIMESTAMP NOT NULL,
+    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (building_id, utility_type, model, forecast_date)
+);
+
+-- Worker dispatch profiles
+CREATE TABLE worker_profiles (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    skills VARCHAR(50)[] NOT NULL DEFAULT '{}',
+    location GEOMETRY(POINT, 4326),
+    max_open_complaints INTEGER NOT NULL DEFAULT 10,
+    active BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+-- Complaint counts per category, day and grid cell
+CREATE TABLE complaint_hotspots (
+    category VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    cell_x INTEGER NOT NULL,
+    cell_y INTEGER NOT NULL,
+    complaint_count INTEGER NOT NULL,
+    PRIMARY KEY (category, day, cell_x, cell_y)
 );
 
 -- Complaint updates table
@@ -68,6 +126,15 @@ CREATE TABLE complaint_updates (
 -- Indexes for performance
 CREATE INDEX idx_complaints_location ON complaints USING GIST(location);
 CREATE INDEX idx_buildings_location ON buildings USING GIST(location);
+CREATE INDEX idx_complaints_location_geog ON complaints USING GIST(geography(location));
+CREATE INDEX idx_buildings_location_geog ON buildings USING GIST(geography(location));
 CREATE INDEX idx_complaints_status ON complaints(status);
 CREATE INDEX idx_complaints_category ON complaints(category);
+CREATE INDEX idx_complaints_priority_keyset ON complaints(priority_score DESC, created_at DESC, id DESC);
+CREATE INDEX idx_complaints_created_at ON complaints(created_at);
+CREATE INDEX idx_complaints_worker_status ON complaints(assigned_worker_id, status);
+CREATE INDEX idx_complaints_unassigned ON complaints(priority_score DESC, created_at, id)
+    WHERE assigned_worker_id IS NULL AND status = 'open';
+CREATE INDEX idx_complaint_hotspots_day ON complaint_hotspots(day);
+CREATE INDEX idx_worker_profiles_location ON worker_profiles USING GIST(location);
 CREATE INDEX idx_utility_consumption_building_date ON utility_consumption(building_id, recorded_date);
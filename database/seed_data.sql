@@ -10,6 +10,10 @@ INSERT INTO users (email, password_hash, role, first_name, last_name, phone, bui
 ('john.doe@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdXdZSk9qY.L2', 'resident', 'John', 'Doe', '+91-9876543210', 1),
 ('worker1@email.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBdXdZSk9qY.L2', 'worker', 'Mike', 'Smith', '+91-9876543211', NULL);
 
+-- Insert sample worker profiles
+INSERT INTO worker_profiles (user_id, skills, location, max_open_complaints) VALUES
+(3, ARRAY['electricity', 'plumbing', 'maintenance'], ST_GeomFromText('POINT(77.2095 28.6140)', 4326), 10);
+
 -- Insert sample utility consumption data
 INSERT INTO utility_consumption (building_id, utility_type, consumption_value, unit, recorded_date) VALUES
 (1, 'water', 15000, 'liters', '2024-01-01'),